@@ -1,6 +1,7 @@
 # Genetic algorithm parameters
 POPULATION_SIZE = 10000
 ELITE_PERCENTAGE = 0.01
+TOURNAMENT_SIZE = 2
 MAX_GENERATIONS = 75
 
 INITIAL_MUTATION_RATE = 0.06
@@ -9,3 +10,49 @@ MAX_MUTATION_RATE = 0.40
 MEDIAN_FITNESS_UPPER_BOUND_RATIO = 0.70
 MEDIAN_FITNESS_LOWER_BOUND_RATIO = 0.50
 MUTATION_RATE_ADJUSTMENT_STEP = 0.005
+
+# Mutation operator: "random" swaps two random mutable cells of a row, "conflict" favours cells
+# in column and block conflicts. MUTATION_LEGAL_ONLY restricts "conflict" to legal swaps.
+MUTATION_OPERATOR = "random"
+MUTATION_LEGAL_ONLY = False
+
+# Per-generation fitness telemetry: a summary with FITNESS_HISTOGRAM_BINS bins and, when
+# FITNESS_RESERVOIR_SIZE > 0, a sample of that many scores. STORE_ALL_FITNESS also keeps every
+# individual's fitness in boxplot_data (memory grows with population size and generations).
+FITNESS_HISTOGRAM_BINS = 20
+FITNESS_RESERVOIR_SIZE = 0
+STORE_ALL_FITNESS = False
+
+# Formats for the batch runner's telemetry files: "csv", "parquet" and "npz" write one columnar
+# file per table for the whole batch, "xlsx" the per-run spreadsheets
+REPORT_FORMATS = ("csv",)
+
+# Solver engine: "ga" runs the genetic algorithm, "exact" a backtracking search and "hybrid"
+# the genetic algorithm with a bounded repair of its best candidates when it stalls
+SOLVER_MODE = "ga"
+EXACT_NODE_LIMIT = None
+
+REPAIR_STAGNATION_GENERATIONS = 10
+REPAIR_CANDIDATES = 5
+REPAIR_NODE_LIMIT = 2000
+
+# Memetic local search: hill-climb the best LOCAL_SEARCH_ELITES boards of each generation with
+# at most LOCAL_SEARCH_BUDGET swap evaluations (0 elites disables it)
+LOCAL_SEARCH_ELITES = 0
+LOCAL_SEARCH_BUDGET = 2000
+
+# Island model (mode "islands"): ISLAND_COUNT processes evolve their own population (by default
+# POPULATION_SIZE split between them) and every ISLAND_MIGRATION_INTERVAL generations send their
+# ISLAND_MIGRANTS best boards to the next island ("ring") or to all others ("full")
+ISLAND_COUNT = 4
+ISLAND_POPULATION_SIZE = None
+ISLAND_MIGRATION_INTERVAL = 10
+ISLAND_MIGRANTS = 5
+ISLAND_TOPOLOGY = "ring"
+# Seconds between checks on the island (and portfolio) processes while waiting for their results
+ISLAND_POLL_SECONDS = 1.0
+
+# Restart portfolio (mode "portfolio"): PORTFOLIO_SIZE independently seeded runs in processes, by
+# default splitting POPULATION_SIZE between them; the first success stops the rest
+PORTFOLIO_SIZE = 4
+PORTFOLIO_POPULATION_SIZE = None
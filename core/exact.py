@@ -0,0 +1,121 @@
+import numpy as np
+from .pre_processing import ALL_CANDIDATES, POPCOUNT
+from .fitness import cell_conflicts
+
+BOX_OF_CELL = [(cell // 9) // 3 * 3 + (cell % 9) // 3 for cell in range(81)]
+
+class ExactSolver(object):
+    # Depth-first search over 9-bit candidate masks, always branching on the empty cell
+    # with the fewest candidates. `nodes` counts visited search nodes; with `node_limit`
+    # the search gives up once it is exceeded and sets `limit_reached`.
+
+    def __init__(self, values, allowed=None, node_limit=None):
+        self.board = [int(value) for value in np.asarray(values).ravel()]
+        self.allowed = [ALL_CANDIDATES] * 81 if allowed is None else [int(mask) for mask in np.asarray(allowed).ravel()]
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.limit_reached = False
+
+        self.rows = [0] * 9
+        self.columns = [0] * 9
+        self.boxes = [0] * 9
+        self.valid = True
+        for cell, value in enumerate(self.board):
+            if value:
+                bit = 1 << value
+                if (self.rows[cell // 9] | self.columns[cell % 9] | self.boxes[BOX_OF_CELL[cell]]) & bit:
+                    self.valid = False
+                self._set(cell, bit)
+        return
+
+    def _set(self, cell, bit):
+        self.rows[cell // 9] |= bit
+        self.columns[cell % 9] |= bit
+        self.boxes[BOX_OF_CELL[cell]] |= bit
+
+    def _clear(self, cell, bit):
+        self.rows[cell // 9] &= ~bit
+        self.columns[cell % 9] &= ~bit
+        self.boxes[BOX_OF_CELL[cell]] &= ~bit
+
+    def _candidates(self, cell):
+        used = self.rows[cell // 9] | self.columns[cell % 9] | self.boxes[BOX_OF_CELL[cell]]
+        return self.allowed[cell] & ~used
+
+    def solve(self):
+        # Returns the first solution found as a (9, 9) array, or None
+        if not self.valid:
+            return None
+        empty = [cell for cell in range(81) if self.board[cell] == 0]
+        if self._search(empty):
+            return np.array(self.board).reshape(9, 9)
+        return None
+
+    def _search(self, empty):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            self.limit_reached = True
+            return False
+        if not empty:
+            return True
+
+        best_position, best_mask, best_count = -1, 0, 10
+        for position, cell in enumerate(empty):
+            mask = self._candidates(cell)
+            count = POPCOUNT[mask]
+            if count < best_count:
+                best_position, best_mask, best_count = position, mask, count
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        cell = empty[best_position]
+        empty[best_position] = empty[-1]
+        empty.pop()
+
+        mask = best_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            self.board[cell] = bit.bit_length() - 1
+            self._set(cell, bit)
+            if self._search(empty):
+                return True
+            self._clear(cell, bit)
+            if self.limit_reached:
+                break
+
+        self.board[cell] = 0
+        empty.append(cell)
+        empty[best_position], empty[-1] = empty[-1], empty[best_position]
+        return False
+
+def repair(values, index, node_limit=None):
+    # Clears every mutable cell caught in a column or block conflict and completes the board by
+    # bounded search. If the kept cells admit no completion, the cleared area is widened to the
+    # rows, then also the columns and blocks, of the conflicts. The node budget covers all of
+    # it; returns the solution (or None) and the nodes spent.
+    values = np.asarray(values, dtype=np.intp)
+    conflicted = (cell_conflicts(values)[0] > 0) & ~index.fixed_mask
+    blocks = conflicted.reshape(3, 3, 3, 3).any(axis=(1, 3))
+    widenings = (
+        conflicted,
+        conflicted.any(axis=1)[:, np.newaxis],
+        conflicted.any(axis=0)[np.newaxis, :],
+        np.repeat(np.repeat(blocks, 3, axis=0), 3, axis=1),
+    )
+
+    cleared = np.zeros((9, 9), dtype=bool)
+    nodes = 0
+    for widening in widenings:
+        cleared |= widening & ~index.fixed_mask
+        budget = None if node_limit is None else node_limit - nodes
+        if budget is not None and budget <= 0:
+            break
+        searcher = ExactSolver(np.where(cleared, 0, values), index.legal_masks, budget)
+        solution = searcher.solve()
+        nodes += searcher.nodes
+        if solution is not None or searcher.limit_reached:
+            return solution, nodes
+    return None, nodes
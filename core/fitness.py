@@ -0,0 +1,110 @@
+import numpy as np
+
+COLUMN_OF_CELL = np.tile(np.arange(9), (9, 1))
+BLOCK_OF_CELL = (np.arange(9)[:, None] // 3) * 3 + np.arange(9)[None, :] // 3
+
+def unit_counts(values, unit_of_cell):
+    # counts[n, unit, digit] for a (N, 9, 9) stack, one bincount for the whole batch
+    num_boards = len(values)
+    keys = (np.arange(num_boards)[:, None, None] * 9 + unit_of_cell) * 10 + values
+    counts = np.bincount(keys.ravel(), minlength=num_boards * 90)
+    return counts.reshape(num_boards, 9, 10)
+
+def unique_totals(counts):
+    return np.count_nonzero(counts[..., 1:] == 1, axis=(-2, -1))
+
+def fitness_from_unique(column_unique, block_unique):
+    column_sum = column_unique / 81
+    block_sum = block_unique / (9 * 9)
+
+    fitness = np.asarray(column_sum * block_sum, dtype=float)
+    fitness[(np.abs(column_sum - 1.0) < 1e-9) & (np.abs(block_sum - 1.0) < 1e-9)] = 1.0
+    return fitness
+
+def batch_fitness(values):
+    values = np.asarray(values, dtype=np.intp).reshape(-1, 9, 9)
+    if not len(values):
+        return np.zeros(0)
+
+    column_unique = unique_totals(unit_counts(values, COLUMN_OF_CELL))
+    block_unique = unique_totals(unit_counts(values, BLOCK_OF_CELL))
+    return fitness_from_unique(column_unique, block_unique)
+
+def cell_conflicts(values):
+    # conflicts[n, row, column]: other cells of the same column or block holding the same digit
+    values = np.asarray(values, dtype=np.intp).reshape(-1, 9, 9)
+    boards = np.arange(len(values))[:, None, None]
+    column = unit_counts(values, COLUMN_OF_CELL)[boards, COLUMN_OF_CELL, values]
+    block = unit_counts(values, BLOCK_OF_CELL)[boards, BLOCK_OF_CELL, values]
+    return np.where(values != 0, column + block - 2, 0)
+
+class UnitCounts(object):
+
+    def __init__(self, values):
+        self.values = values
+        indices = np.asarray(values, dtype=np.intp).reshape(-1, 9, 9)
+        self.column = unit_counts(indices, COLUMN_OF_CELL).astype(np.int8)
+        self.block = unit_counts(indices, BLOCK_OF_CELL).astype(np.int8)
+        self.column_unique = unique_totals(self.column)
+        self.block_unique = unique_totals(self.block)
+        return
+
+    def fitness(self, boards=slice(None)):
+        return fitness_from_unique(self.column_unique[boards], self.block_unique[boards])
+
+    def swap(self, boards, rows, columns1, columns2):
+        # Swaps two cells of the same row in each listed board (a board may appear only once
+        # per call) and updates the counts in O(1). Repeating the same call undoes it.
+        boards = np.asarray(boards, dtype=np.intp)
+        rows = np.asarray(rows, dtype=np.intp)
+        columns1 = np.asarray(columns1, dtype=np.intp)
+        columns2 = np.asarray(columns2, dtype=np.intp)
+
+        first = self.values[boards, rows, columns1].astype(np.intp)
+        second = self.values[boards, rows, columns2].astype(np.intp)
+        self.values[boards, rows, columns1] = second
+        self.values[boards, rows, columns2] = first
+
+        self.column_unique[boards] += self._move(self.column, boards, columns1, columns2, first, second)
+        blocks1 = BLOCK_OF_CELL[rows, columns1]
+        blocks2 = BLOCK_OF_CELL[rows, columns2]
+        self.block_unique[boards] += self._move(self.block, boards, blocks1, blocks2, first, second)
+        return self.fitness(boards)
+
+    @staticmethod
+    def _move(counts, boards, units1, units2, first, second):
+        # `first` leaves units1 for units2 and `second` goes the other way
+        delta = np.zeros(len(boards), dtype=np.intp)
+        for units, digits, step in ((units1, first, -1), (units1, second, 1),
+                                    (units2, second, -1), (units2, first, 1)):
+            before = counts[boards, units, digits]
+            after = before + step
+            counts[boards, units, digits] = after
+            delta += ((after == 1).astype(np.intp) - (before == 1)) * (digits != 0)
+        return delta
+
+def fitness_summary(fitness, generation, histogram_bins=20, reservoir_size=0, rng=None):
+    # Distribution of one generation's fitness vector: quartiles, mean, a histogram over
+    # histogram_bins equal bins of [0, 1] and, with reservoir_size, a uniform sample of scores
+    fitness = np.asarray(fitness, dtype=float)
+    if not len(fitness):
+        return None
+
+    minimum, quartile_1, median, quartile_3, maximum = np.quantile(fitness, (0.0, 0.25, 0.5, 0.75, 1.0))
+    bins = np.clip((fitness * histogram_bins).astype(np.intp), 0, histogram_bins - 1)
+    summary = {
+        'Geracao': generation,
+        'Minimo': float(minimum),
+        'Quartil_1': float(quartile_1),
+        'Mediana': float(median),
+        'Quartil_3': float(quartile_3),
+        'Maximo': float(maximum),
+        'Media': float(fitness.mean()),
+        'Desvio_Padrao': float(fitness.std()),
+        'Histograma': np.bincount(bins, minlength=histogram_bins).astype(np.int32)
+    }
+    if reservoir_size > 0:
+        rng = rng if rng is not None else np.random.default_rng()
+        sample = rng.choice(len(fitness), min(reservoir_size, len(fitness)), replace=False)
+        summary['Amostra'] = fitness[sample].astype(np.float32)
+    return summary
@@ -1,76 +1,87 @@
 import numpy as np
-import random
-from .individual import Candidate
+
+from .fitness import UnitCounts, cell_conflicts
 
 class Tournament(object):
-    def __init__(self):
-        self.tournament_size = 2
+    def __init__(self, tournament_size=2, rng=None):
+        self.tournament_size = tournament_size
+        self.rng = rng if rng is not None else np.random.default_rng()
         return
 
-    def compete(self, candidates):
-        if not candidates:
-            return None
-
-        num_total_candidates = len(candidates)
+    def compete(self, fitness):
+        winners = self.select(fitness, 1)
+        return int(winners[0]) if len(winners) else None
 
+    def select(self, fitness, num_winners):
+        # Draws every tournament of the generation as one (num_winners, size) index array
+        num_total_candidates = len(fitness)
         actual_tournament_size = min(self.tournament_size, num_total_candidates)
 
         if actual_tournament_size == 0:
-            return None
-
-        tournament_participants = random.sample(candidates, actual_tournament_size)
+            return np.zeros(0, dtype=np.intp)
 
-        best_participant = tournament_participants[0]
+        # Participants of one tournament are distinct, as with random.sample
+        if actual_tournament_size * actual_tournament_size > num_total_candidates:
+            participants = np.array([self.rng.choice(num_total_candidates, actual_tournament_size, replace=False)
+                                     for _ in range(num_winners)], dtype=np.intp).reshape(num_winners, actual_tournament_size)
+        else:
+            participants = self.rng.integers(0, num_total_candidates, (num_winners, actual_tournament_size))
+            repeated = np.flatnonzero(np.any(np.diff(np.sort(participants, axis=1), axis=1) == 0, axis=1))
+            while len(repeated):
+                participants[repeated] = self.rng.integers(0, num_total_candidates, (len(repeated), actual_tournament_size))
+                still_repeated = np.any(np.diff(np.sort(participants[repeated], axis=1), axis=1) == 0, axis=1)
+                repeated = repeated[still_repeated]
 
-        best_fitness = best_participant.fitness if best_participant.fitness is not None else -float('inf')
-
-        for i in range(1, len(tournament_participants)):
-            participant = tournament_participants[i]
-            participant_fitness = participant.fitness if participant.fitness is not None else -float('inf')
-            if participant_fitness > best_fitness:
-                best_fitness = participant_fitness
-                best_participant = participant
-
-        return best_participant
+        best = np.argmax(np.asarray(fitness)[participants], axis=1)
+        return participants[np.arange(num_winners), best]
 
 class CXCrossover(object):
     def __init__(self):
         return
 
     def crossover(self, parent1, parent2):
-        child1 = Candidate()
-        child2 = Candidate()
+        child1 = np.copy(parent1)
+        child2 = np.copy(parent2)
 
-        if parent1 is None or parent2 is None or parent1.values is None or parent2.values is None:
-            if parent1 is not None:
-                child1.values = np.copy(parent1.values)
-            else:
-                child1.values = np.zeros((9,9))
+        for k_row in range(9):
+            res_c1, res_c2 = self.cx_row_segment(parent1[k_row], parent2[k_row])
+            child1[k_row] = res_c1
+            child2[k_row] = res_c2
 
-            if parent2 is not None:
-                child2.values = np.copy(parent2.values)
-            else:
-                child2.values = np.zeros((9,9))
+        return child1, child2
 
-            if parent1:
-                child1.update_fitness()
+    def crossover_batch(self, values, parents1, parents2):
+        # Same children as crossover() for every (parents1[k], parents2[k]) pair, all rows at once
+        rows1 = values[parents1].reshape(-1, 9).astype(np.intp)
+        rows2 = values[parents2].reshape(-1, 9).astype(np.intp)
+        row_ids = np.arange(len(rows1))[:, None]
+        positions = np.arange(9)
 
-            if parent2:
-                child2.update_fitness()
+        # Rows that are not permutations of the same values follow the scalar path
+        regular = np.all(np.sort(rows1, axis=1) == np.sort(rows2, axis=1), axis=1)
+        regular &= np.all(np.diff(np.sort(rows2, axis=1), axis=1) != 0, axis=1)
 
-            return child1, child2
+        inverse2 = np.zeros((len(rows2), 10), dtype=np.intp)
+        inverse2[row_ids, rows2] = positions
+        next_index = inverse2[row_ids, rows1]
 
-        child1.values = np.copy(parent1.values)
-        child2.values = np.copy(parent2.values)
+        # The scalar loop opens cycles in order of their smallest index, so label every
+        # position with the minimum of its cycle (pointer doubling) and rank those minima.
+        cycle_min = np.broadcast_to(positions, rows1.shape).copy()
+        jump = next_index
+        for _ in range(4):
+            cycle_min = np.minimum(cycle_min, np.take_along_axis(cycle_min, jump, axis=1))
+            jump = np.take_along_axis(jump, jump, axis=1)
+        cycle_rank = np.cumsum(cycle_min == positions, axis=1) - 1
+        odd_cycle = np.take_along_axis(cycle_rank, cycle_min, axis=1) % 2 == 1
 
-        for k_row in range(9):
-            if k_row < parent1.values.shape[0] and k_row < parent2.values.shape[0]:
-                res_c1, res_c2 = self.cx_row_segment(parent1.values[k_row], parent2.values[k_row])
-                if res_c1 is not None and res_c2 is not None:
-                    child1.values[k_row] = res_c1
-                    child2.values[k_row] = res_c2
+        children1 = np.where(odd_cycle, rows2, rows1)
+        children2 = np.where(odd_cycle, rows1, rows2)
 
-        return child1, child2
+        for row_idx in np.flatnonzero(~regular):
+            children1[row_idx], children2[row_idx] = self.cx_row_segment(rows1[row_idx], rows2[row_idx])
+
+        return children1.reshape(-1, 9, 9), children2.reshape(-1, 9, 9)
 
     def cx_row_segment(self, row1_parent, row2_parent):
         n = len(row1_parent)
@@ -109,24 +120,168 @@ class CXCrossover(object):
 
         return child_row1, child_row2
 
-def mutate(candidate, mutation_rate, given):
-    r = random.uniform(0, 1.1)
+def select_survivors(fitness, num_survivors, num_elites, rng):
+    num_total_candidates = len(fitness)
+    num_elites = min(num_elites, num_total_candidates, num_survivors)
+
+    pool = np.arange(num_total_candidates)
+    selected = []
+
+    if num_elites > 0:
+        elites = np.argpartition(-fitness, num_elites - 1)[:num_elites]
+        elites = elites[np.argsort(-fitness[elites], kind='stable')]
+        available = np.ones(num_total_candidates, dtype=bool)
+        available[elites] = False
+        pool = pool[available]
+        selected.append(elites)
+
+    # Sequential binary tournaments: each draws two distinct members of the current pool and
+    # only the winner leaves it, so a loser can be drawn again. The winner is swapped into the
+    # last slot and the pool shrinks by one, which keeps every tournament O(1).
+    num_to_select = num_survivors - num_elites
+    num_tournaments = min(num_to_select, max(len(pool) - 1, 0))
+    draws = rng.random((num_tournaments, 2))
+    pool_fitness = fitness.tolist()
+    pool = pool.tolist()
+    winners = []
+    size = len(pool)
+    for first_draw, second_draw in draws.tolist():
+        position1 = int(first_draw * size)
+        position2 = int(second_draw * (size - 1))
+        if position2 >= position1:
+            position2 += 1
+        participant1, participant2 = pool[position1], pool[position2]
+        if pool_fitness[participant1] >= pool_fitness[participant2]:
+            winner_position = position1
+        else:
+            winner_position = position2
+        winners.append(pool[winner_position])
+        size -= 1
+        pool[winner_position] = pool[size]
+    num_to_select -= len(winners)
+    selected.append(np.array(winners, dtype=np.intp))
+
+    if num_to_select > 0 and size == 1:
+        selected.append(np.array(pool[:1], dtype=np.intp))
+        num_to_select -= 1
+
+    survivors = np.concatenate(selected) if selected else np.zeros(0, dtype=np.intp)
+
+    if num_to_select > 0 and num_total_candidates:
+        filler = np.argsort(-fitness, kind='stable')
+        survivors = np.concatenate((survivors, np.resize(filler, num_to_select)))
+
+    return survivors
+
+def weighted_choice(weights, rng):
+    # One column index per row of `weights`, drawn proportionally to it; -1 for all-zero rows
+    cumulative = np.cumsum(weights, axis=1)
+    totals = cumulative[:, -1]
+    draws = rng.random(len(weights)) * totals
+    choice = np.minimum(np.sum(cumulative <= draws[:, np.newaxis], axis=1), weights.shape[1] - 1)
+    return np.where(totals > 0, choice, -1)
+
+def conflict_swaps(values, index, rng, legal_only=False):
+    # One swap per (N, 9, 9) board. The first cell is drawn by its column and block conflicts
+    # (uniformly over mutable cells when the board has none), its partner from the same row
+    # with weight 1 + conflicts. With `legal_only`, partners whose swap would put either digit
+    # where it is not legal are excluded, and boards left without a partner are skipped.
+    # Returns (boards, rows, columns1, columns2).
+    values = np.asarray(values, dtype=np.intp).reshape(-1, 9, 9)
+    num_boards = len(values)
+    boards = np.arange(num_boards)
+    if not num_boards or not len(index.swappable_rows):
+        return boards, boards, boards, boards
+
+    swappable = ~index.fixed_mask & (index.mutable_counts >= 2)[:, np.newaxis]
+    conflicts = cell_conflicts(values) * swappable
+    weights = conflicts.reshape(num_boards, 81).astype(float)
+    weights[weights.sum(axis=1) == 0] = swappable.ravel()
+    cells = weighted_choice(weights, rng)
+    rows, columns1 = cells // 9, cells % 9
+
+    partners = (conflicts[boards, rows] + 1.0) * ~index.fixed_mask[rows]
+    partners[boards, columns1] = 0
+    if legal_only:
+        first = values[boards, rows, columns1]
+        partners *= (index.legal[rows[:, np.newaxis], np.arange(9), first[:, np.newaxis]] &
+                     index.legal[rows[:, np.newaxis], columns1[:, np.newaxis], values[boards, rows]])
+    columns2 = weighted_choice(partners, rng)
+
+    keep = columns2 >= 0
+    return boards[keep], rows[keep], columns1[keep], columns2[keep]
+
+def draw_swaps(index, num_boards, rng):
+    # One random within-row swap of two mutable cells per board, as (rows, columns1, columns2)
+    rows = index.swappable_rows[rng.integers(len(index.swappable_rows), size=num_boards)]
+    sizes = index.mutable_counts[rows]
+    first = rng.integers(sizes)
+    second = (first + 1 + rng.integers(sizes - 1)) % sizes
+    return rows, index.mutable_table[rows, first], index.mutable_table[rows, second]
+
+def local_search(values, fitness, index, budget, rng):
+    # Hill-climbs the (k, 9, 9) boards in place with within-row swaps of mutable cells, keeping
+    # a swap only when it raises that board's fitness. `budget` caps the swaps scored over all
+    # boards. Returns (improvements, evaluations); `fitness` is updated in place.
+    num_boards = min(len(values), budget)
+    if num_boards <= 0 or not len(index.swappable_rows):
+        return 0, 0
+
+    counts = UnitCounts(values[:num_boards])
+    current = counts.fitness()
+    improvements = 0
+    evaluations = 0
+    for _ in range(budget // num_boards):
+        boards = np.arange(num_boards)
+        rows, columns1, columns2 = draw_swaps(index, num_boards, rng)
+        if index.candidates is not None:
+            first = counts.values[boards, rows, columns1]
+            second = counts.values[boards, rows, columns2]
+            legal = index.legal[rows, columns2, first] & index.legal[rows, columns1, second]
+            boards, rows, columns1, columns2 = boards[legal], rows[legal], columns1[legal], columns2[legal]
+
+        scored = counts.swap(boards, rows, columns1, columns2)
+        evaluations += len(boards)
+        rejected = scored <= current[boards]
+        counts.swap(boards[rejected], rows[rejected], columns1[rejected], columns2[rejected])
+        current[boards[~rejected]] = scored[~rejected]
+        improvements += int(np.count_nonzero(~rejected))
+
+    values[:num_boards] = counts.values
+    fitness[:num_boards] = current
+    return improvements, evaluations
 
-    success = False
-    if random.random() < mutation_rate:
-        attempts = 0
-        while not success and attempts < 50:
-            attempts +=1
-            row1 = random.randint(0, 8)
+def select_mutations(values, mutation_rates, index, rng, operator="random", legal_only=False):
+    # Picks the mutated boards of a (N, 9, 9) stack with one draw against `mutation_rates`
+    # (a scalar or one rate per board) and one swap for each, without applying it. Illegal
+    # random swaps are redrawn up to 50 times.
+    # Returns (boards, rows, columns1, columns2).
+    values = np.asarray(values)
+    rates = np.broadcast_to(mutation_rates, (len(values),))
+    chosen = np.flatnonzero(rng.random(len(values)) < rates)
+    if not len(chosen) or not len(index.swappable_rows):
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, empty, empty
 
-            mutable_columns = [col for col in range(9) if given.values[row1][col] == 0]
+    if operator == "conflict":
+        boards, rows, columns1, columns2 = conflict_swaps(values[chosen], index, rng, legal_only)
+        return chosen[boards], rows, columns1, columns2
 
-            if len(mutable_columns) >= 2:
-                from_column, to_column = random.sample(mutable_columns, 2)
+    rows, columns1, columns2 = draw_swaps(index, len(chosen), rng)
+    if not legal_only:
+        return chosen, rows, columns1, columns2
 
-                temp = candidate.values[row1][to_column]
-                candidate.values[row1][to_column] = candidate.values[row1][from_column]
-                candidate.values[row1][from_column] = temp
-                success = True
+    pending = np.arange(len(chosen))
+    for _ in range(50):
+        first = values[chosen[pending], rows[pending], columns1[pending]]
+        second = values[chosen[pending], rows[pending], columns2[pending]]
+        illegal = ~(index.legal[rows[pending], columns2[pending], first] &
+                    index.legal[rows[pending], columns1[pending], second])
+        pending = pending[illegal]
+        if not len(pending):
+            break
+        rows[pending], columns1[pending], columns2[pending] = draw_swaps(index, len(pending), rng)
 
-    return success
\ No newline at end of file
+    keep = np.ones(len(chosen), dtype=bool)
+    keep[pending] = False
+    return chosen[keep], rows[keep], columns1[keep], columns2[keep]
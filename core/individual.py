@@ -1,37 +1,36 @@
 import numpy as np
+from .fitness import UnitCounts
+from .validation import no_duplicates
+
+def legal_digits(fixed, candidates=None):
+    # legal[row, column, digit]: digit is not given in that column or block and, when the
+    # preprocessor's candidate masks are passed, was not eliminated from that cell
+    digits = np.arange(10)
+    in_column = np.any(fixed[:, :, np.newaxis] == digits, axis=0)
+    in_block = np.any(fixed.reshape(3, 3, 3, 3)[..., np.newaxis] == digits, axis=(1, 3))
+    blocked = in_column[np.newaxis, :, :] | np.repeat(np.repeat(in_block, 3, axis=0), 3, axis=1)
+    if candidates is not None:
+        blocked |= (np.asarray(candidates, dtype=np.intp)[:, :, np.newaxis] >> digits & 1) == 0
+    return ~blocked
 
 class Candidate(object):
 
     def __init__(self):
-        self.values = np.zeros((9, 9))
+        self.values = np.zeros((9, 9), dtype=np.int8)
         self.fitness = None
+        self.counts = None
         return
 
     def update_fitness(self):
-        column_sum = 0
-        block_sum = 0
         self.values = self.values.astype(int)
+        self.counts = UnitCounts(self.values[np.newaxis])
+        self.fitness = float(self.counts.fitness()[0])
+        return
 
-        for j in range(0, 9):
-            column_values_for_count = self.values[:, j]
-            unique_elements_col, counts_in_col = np.unique(column_values_for_count[column_values_for_count != 0], return_counts=True)
-            column_sum += np.sum(counts_in_col == 1)
-
-        column_sum = column_sum / 81
-
-        for r_offset in range(0, 9, 3):
-            for c_offset in range(0, 9, 3):
-                block_values_for_count = self.values[r_offset:r_offset+3, c_offset:c_offset+3].flatten()
-                unique_elements_block, counts_in_block = np.unique(block_values_for_count[block_values_for_count != 0], return_counts=True)
-                block_sum += np.sum(counts_in_block == 1)
-
-        block_sum = block_sum / (9 * 9)
-
-        if abs(column_sum - 1.0) < 1e-9 and abs(block_sum - 1.0) < 1e-9 :
-            fitness = 1.0
-        else:
-            fitness = column_sum * block_sum
-        self.fitness = fitness
+    def swap(self, row, column1, column2):
+        if self.counts is None:
+            self.update_fitness()
+        self.fitness = float(self.counts.swap([0], [row], [column1], [column2])[0])
         return
 
     def _get_col_counts(self, col_idx):
@@ -55,6 +54,7 @@ class Fixed(Candidate):
     def __init__(self, values):
         self.values = values
         self.fitness = None
+        self.counts = None
         return
 
     def is_row_duplicate(self, row_idx, value):
@@ -80,20 +80,39 @@ class Fixed(Candidate):
         return False
 
     def no_duplicates(self):
-        for r_idx in range(0, 9):
-            for c_idx in range(0, 9):
-                val = self.values[r_idx][c_idx]
-                if val != 0:
-                    for c_check in range(0, 9):
-                        if c_check != c_idx and self.values[r_idx][c_check] == val:
-                            return False
-                    for r_check in range(0, 9):
-                        if r_check != r_idx and self.values[r_check][c_idx] == val:
-                            return False
-                    block_row_start = (r_idx // 3) * 3
-                    block_col_start = (c_idx // 3) * 3
-                    for r_b_offset in range(block_row_start, block_row_start + 3):
-                        for c_b_offset in range(block_col_start, block_col_start + 3):
-                            if (r_b_offset != r_idx or c_b_offset != c_idx) and self.values[r_b_offset][c_b_offset] == val:
-                                return False
-        return True
\ No newline at end of file
+        return no_duplicates(self.values)
+
+class GivenIndex(object):
+    # Read-only facts about the givens, built once per puzzle and shared by seeding,
+    # mutation and validation instead of rescanning the board
+
+    def __init__(self, values, candidates=None):
+        self.fixed = np.array(values, dtype=np.intp)
+        self.fixed_mask = self.fixed != 0
+        self.candidates = None if candidates is None else np.array(candidates, dtype=np.intp)
+
+        self.legal = legal_digits(self.fixed, self.candidates)
+        self.legal_masks = np.sum(self.legal[:, :, 1:] << np.arange(1, 10), axis=2)
+        self.mutable_columns = tuple(tuple(np.flatnonzero(~self.fixed_mask[row]).tolist()) for row in range(9))
+        self.missing_digits = tuple(np.setdiff1d(np.arange(1, 10), self.fixed[row]) for row in range(9))
+        self.rows_consistent = all(len(self.mutable_columns[row]) == len(self.missing_digits[row]) for row in range(9))
+
+        # mutable_table[row, :mutable_counts[row]] holds the mutable columns of each row, so
+        # swaps can be drawn for many boards at once
+        self.mutable_counts = np.array([len(columns) for columns in self.mutable_columns])
+        self.mutable_table = np.zeros((9, 9), dtype=np.intp)
+        for row, columns in enumerate(self.mutable_columns):
+            self.mutable_table[row, :len(columns)] = columns
+        self.swappable_rows = np.flatnonzero(self.mutable_counts >= 2)
+
+        for array in (self.fixed, self.fixed_mask, self.legal, self.legal_masks,
+                      self.mutable_counts, self.mutable_table, self.swappable_rows) + self.missing_digits:
+            array.setflags(write=False)
+        if self.candidates is not None:
+            self.candidates.setflags(write=False)
+        return
+
+    def keeps_givens(self, values):
+        # True for every board in `values` ((9, 9) or (N, 9, 9)) that still holds all givens
+        values = np.asarray(values).reshape(-1, 9, 9)
+        return np.all(values[:, self.fixed_mask] == self.fixed[self.fixed_mask], axis=1)
@@ -0,0 +1,149 @@
+import multiprocessing
+import queue
+import numpy as np
+
+from .config import *
+
+def migration_targets(num_islands, topology):
+    if topology == "full":
+        return [[other for other in range(num_islands) if other != island] for island in range(num_islands)]
+    if topology == "ring":
+        return [[(island + 1) % num_islands] if num_islands > 1 else [] for island in range(num_islands)]
+    raise ValueError("Topologia de migração desconhecida: %s" % topology)
+
+def run_island(island, fixed, candidates, seed, population_size, inboxes, targets, stop_event, results):
+    from .solver import Sudoku
+
+    # Migrants left in a queue when an island stops are dropped instead of blocking its exit
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+    received = [0]
+
+    def migrate(generation, population):
+        if stop_event.is_set():
+            return False
+        if generation and generation % ISLAND_MIGRATION_INTERVAL == 0:
+            best = population.best(ISLAND_MIGRANTS)
+            for target in targets:
+                inboxes[target].put((population.values[best].copy(), population.fitness[best].copy()))
+        while True:
+            try:
+                values, fitness = inboxes[island].get_nowait()
+            except queue.Empty:
+                break
+            received[0] += population.immigrate(values, fitness)
+        return True
+
+    output = {'island': island, 'generation': -1, 'fitness_history': [], 'fitness_evaluations': 0}
+    try:
+        sudoku = Sudoku(seed=seed, population_size=population_size)
+        sudoku.load(fixed, candidates)
+        output = sudoku.solve(mode="ga", migration=migrate)
+        output['island'] = island
+        if output['generation'] >= 0:
+            stop_event.set()
+    except Exception as e:
+        output['error'] = repr(e)
+    finally:
+        output['migrants_received'] = received[0]
+        results.put(output)
+    return
+
+def run_in_processes(sudoku, num_runs, population_size, targets):
+    # Starts one seeded GA run per process and collects their outputs in arrival order. The
+    # first solved run sets the stop event, so the others end at their next generation.
+    seeds = [int(seed) for seed in np.random.SeedSequence(sudoku.seed).generate_state(num_runs)]
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(num_runs)]
+    results = context.Queue()
+    stop_event = context.Event()
+    workers = [context.Process(target=run_island,
+                               args=(run, sudoku.index.fixed, sudoku.index.candidates, seeds[run],
+                                     population_size, inboxes, targets[run], stop_event, results))
+               for run in range(num_runs)]
+    for worker in workers:
+        worker.start()
+
+    # The results queue is polled so a process that dies without reporting (killed, crashed, or
+    # unable to send its output) cannot block the wait. Once it has been found dead on two polls
+    # in a row with nothing arriving in between, its run is recorded as an error entry.
+    arrivals = []
+    reported = set()
+    found_dead = set()
+    while len(reported) < num_runs:
+        try:
+            output = results.get(timeout=ISLAND_POLL_SECONDS)
+        except queue.Empty:
+            for run, worker in enumerate(workers):
+                if run in reported or worker.is_alive():
+                    continue
+                if run in found_dead:
+                    reported.add(run)
+                    arrivals.append({'island': run, 'generation': -1, 'fitness_history': [], 'fitness_evaluations': 0,
+                                     'migrants_received': 0,
+                                     'error': f"Processo terminou sem enviar resultado (código de saída {worker.exitcode})"})
+                found_dead.add(run)
+            continue
+        if output['island'] in reported:
+            continue
+        reported.add(output['island'])
+        arrivals.append(output)
+        if output['generation'] >= 0:
+            stop_event.set()
+    for worker in workers:
+        worker.join()
+    return seeds, arrivals
+
+def merge_runs(default_return_metrics, arrivals):
+    # Fills the usual result keys from the first solved run, or from the fittest one
+    ordered = sorted(arrivals, key=lambda output: output['island'])
+    solved = [output for output in arrivals if output['generation'] >= 0]
+    if solved:
+        chosen = solved[0]
+    else:
+        finished = [output for output in ordered if output.get('solution_candidate') is not None]
+        chosen = max(finished, key=lambda output: output['solution_candidate'].fitness) if finished else None
+
+    if chosen is not None:
+        default_return_metrics.update({key: value for key, value in chosen.items() if key in default_return_metrics})
+        if not solved:
+            default_return_metrics['generation'] = -2
+            default_return_metrics['solution_index'] = -1
+    default_return_metrics.update({
+        'fitness_evaluations': sum(output['fitness_evaluations'] for output in ordered),
+        'island_errors': [output['error'] for output in ordered if 'error' in output]
+    })
+    return ordered, solved[0]['island'] if solved else -1
+
+def solve_islands(sudoku, default_return_metrics):
+    # Runs ISLAND_COUNT seeded GA islands in worker processes; the first island to solve the
+    # puzzle stops the others
+    num_islands = ISLAND_COUNT
+    total_population = POPULATION_SIZE if sudoku.population_size is None else sudoku.population_size
+    population_size = ISLAND_POPULATION_SIZE or max(2, total_population // num_islands)
+    targets = migration_targets(num_islands, ISLAND_TOPOLOGY)
+
+    seeds, arrivals = run_in_processes(sudoku, num_islands, population_size, targets)
+    island_results, winner = merge_runs(default_return_metrics, arrivals)
+    default_return_metrics.update({
+        'island_histories': [output['fitness_history'] for output in island_results],
+        'island_seeds': seeds,
+        'winning_island': winner,
+        'migrants_received': sum(output['migrants_received'] for output in island_results)
+    })
+    return default_return_metrics
+
+def solve_portfolio(sudoku, default_return_metrics):
+    # PORTFOLIO_SIZE independent restarts with smaller populations: islands that never migrate
+    num_runs = PORTFOLIO_SIZE
+    total_population = POPULATION_SIZE if sudoku.population_size is None else sudoku.population_size
+    population_size = PORTFOLIO_POPULATION_SIZE or max(2, total_population // num_runs)
+
+    seeds, arrivals = run_in_processes(sudoku, num_runs, population_size, [[] for _ in range(num_runs)])
+    run_results, winner = merge_runs(default_return_metrics, arrivals)
+    default_return_metrics.update({
+        'portfolio_seeds': seeds,
+        'winning_seed': seeds[winner] if winner >= 0 else None,
+        'portfolio_generations': [output['generation'] for output in run_results]
+    })
+    return default_return_metrics
@@ -1,103 +1,136 @@
 import numpy as np
-import random
-import operator
 from .individual import Candidate
+from .fitness import batch_fitness
+
+# Rows with more legal completions than this are sampled by rejection instead of enumerated.
+# Above it acceptance of a random permutation is at least 40320 / 9! (about 11%).
+ROW_MATCHING_LIMIT = 40320
+
+def enumerate_matchings(allowed, limit):
+    # Every assignment of the row's missing digits to its blanks with allowed[cell, digit],
+    # or None when there are more than `limit` of them
+    num_cells = len(allowed)
+    order = np.argsort(np.count_nonzero(allowed, axis=1), kind='stable')
+    options = [np.flatnonzero(allowed[cell]).tolist() for cell in order]
+    assignment = [0] * num_cells
+    used = [False] * num_cells
+    found = []
+
+    def extend(depth):
+        if depth == num_cells:
+            found.append(list(assignment))
+            return len(found) <= limit
+        for digit in options[depth]:
+            if not used[digit]:
+                used[digit] = True
+                assignment[depth] = digit
+                if not extend(depth + 1):
+                    return False
+                used[digit] = False
+        return True
+
+    if not extend(0):
+        return None
+
+    matchings = np.zeros((len(found), num_cells), dtype=np.intp)
+    if found:
+        matchings[:, order] = np.array(found)
+    return matchings
+
+def sample_row_matchings(allowed, count, rng):
+    # Uniform over the legal completions of one row, the same distribution the old
+    # draw-and-retry loop converged to, returned as indices into the missing digits
+    matchings = enumerate_matchings(allowed, ROW_MATCHING_LIMIT)
+    if matchings is not None:
+        if len(matchings):
+            return matchings[rng.integers(0, len(matchings), count)]
+        # No legal completion: fill the row with its missing digits in any order
+        allowed = np.ones_like(allowed)
+
+    num_cells = len(allowed)
+    result = np.empty((count, num_cells), dtype=np.intp)
+    pending = np.arange(count)
+    while len(pending):
+        permutations = np.argsort(rng.random((len(pending), num_cells)), axis=1)
+        accepted = np.all(allowed[np.arange(num_cells), permutations], axis=1)
+        result[pending[accepted]] = permutations[accepted]
+        pending = pending[~accepted]
+    return result
 
 class Population(object):
 
     def __init__(self):
-        self.candidates = []
+        self.values = np.zeros((0, 9, 9), dtype=np.int8)
+        self.fitness = np.zeros(0)
+        self.dirty = np.zeros(0, dtype=bool)
         return
 
-    def seed(self, population, given):
-        self.candidates = []
-        helper = Candidate()
-        helper.values = [[[] for j in range(0, 9)] for i in range(0, 9)]
-        for row in range(0, 9):
-            for column in range(0, 9):
-                for value in range(1, 10):
-                    if ((given.values[row][column] == 0) and not (given.is_column_duplicate(column, value) or given.is_block_duplicate(row, column, value) or given.is_row_duplicate(row, value))):
-                        helper.values[row][column].append(value)
-                    elif given.values[row][column] != 0:
-                        helper.values[row][column].append(given.values[row][column])
-                        break
-        
-        max_generation_attempts = 500000
-
-        for p in range(0, population):
-            g = Candidate()
-            for i in range(0, 9):
-                row_values = np.zeros(9)
-                for j in range(0, 9):
-                    if given.values[i][j] != 0:
-                        row_values[j] = given.values[i][j]
-                    elif given.values[i][j] == 0:
-                        if not helper.values[i][j]:
-                            row_values[j] = 0
-                        else:
-                            row_values[j] = helper.values[i][j][random.randint(0, len(helper.values[i][j]) - 1)]
-                
-                try_count = 0
-
-                while len(list(set(row_values))) != 9:
-                    try_count += 1
-                    if try_count > max_generation_attempts:
-                        problematic_indices = [idx for idx, val in enumerate(given.values[i]) if val == 0]
-                        random.shuffle(problematic_indices)
-                        temp_row = np.copy(given.values[i])
-                        numbers_to_fill = [n for n in range(1,10) if n not in temp_row]
-                        random.shuffle(numbers_to_fill)
-
-                        current_index  = 0
-                        for problematic_idx in problematic_indices:
-                            if current_index  < len(numbers_to_fill):
-                                temp_row[problematic_idx] = numbers_to_fill[current_index ]
-                                current_index  +=1
-                            else:
-                                temp_row[problematic_idx] = 0
-                        
-                        row_values = temp_row
-                        
-                        if len(list(set(row_values))) != 9 and 0 not in row_values:
-                             fixed_elements = {val for val in given.values[i] if val != 0}
-                             available_numbers = [n for n in range(1,10) if n not in fixed_elements]
-                             random.shuffle(available_numbers)
-
-                             current_fill_idx = 0
-                             new_row_attempt = np.zeros(9, dtype=int)
-                             for col_idx_fill in range(9):
-                                 if given.values[i][col_idx_fill] != 0:
-                                     new_row_attempt[col_idx_fill] = given.values[i][col_idx_fill]
-                                 else:
-                                     if current_fill_idx < len(available_numbers):
-                                         new_row_attempt[col_idx_fill] = available_numbers[current_fill_idx]
-                                         current_fill_idx +=1
-                                     else:
-                                         new_row_attempt[col_idx_fill] = 0
-                             row_values = new_row_attempt
-
-                        if try_count > 500001 and len(list(set(row_values))) != 9:
-                            return 0
-
-
-                    for j_idx in range(0, 9):
-                        if given.values[i][j_idx] == 0:
-                            if not helper.values[i][j_idx]:
-                                row_values[j_idx] = 0
-                            else:
-                                row_values[j_idx] = helper.values[i][j_idx][random.randint(0, len(helper.values[i][j_idx]) - 1)]
-                g.values[i] = row_values
-            self.candidates.append(g)
-        self.update_fitness()
+    def __len__(self):
+        return len(self.fitness)
+
+    def seed(self, population, index, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+
+        self.values = np.repeat(index.fixed[np.newaxis].astype(np.int8), population, axis=0)
+        self.fitness = np.zeros(population)
+        self.dirty = np.ones(population, dtype=bool)
+
+        if not index.rows_consistent:
+            return 0
+
+        for row in range(9):
+            blanks = index.mutable_columns[row]
+            if not blanks:
+                continue
+
+            missing = index.missing_digits[row]
+            allowed = index.legal[row][list(blanks)][:, missing]
+            self.values[:, row, blanks] = missing[sample_row_matchings(allowed, population, rng)]
         return 1
 
     def update_fitness(self):
-        for candidate in self.candidates:
-            candidate.update_fitness()
-        return
+        # Only genomes changed since their last evaluation are scored; returns how many were.
+        dirty_indices = np.flatnonzero(self.dirty)
+        if len(dirty_indices):
+            self.fitness[dirty_indices] = batch_fitness(self.values[dirty_indices])
+            self.dirty[dirty_indices] = False
+        return len(dirty_indices)
 
     def sort(self):
-        self.candidates = sorted([c for c in self.candidates if c.fitness is not None],
-                                 key=operator.attrgetter('fitness'),
-                                 reverse=True)
-        return
\ No newline at end of file
+        order = np.argsort(-self.fitness, kind='stable')
+        self.values = self.values[order]
+        self.fitness = self.fitness[order]
+        self.dirty = self.dirty[order]
+        return
+
+    def replace(self, values, fitness):
+        self.values = np.ascontiguousarray(values, dtype=np.int8)
+        self.fitness = np.asarray(fitness, dtype=float)
+        self.dirty = np.zeros(len(self.fitness), dtype=bool)
+        return
+
+    def immigrate(self, values, fitness):
+        # Migrants take the places of the worst scored individuals
+        num_migrants = min(len(values), len(self))
+        if not num_migrants:
+            return 0
+        scores = np.where(self.dirty, -np.inf, self.fitness)
+        worst = np.argpartition(scores, num_migrants - 1)[:num_migrants]
+        self.values[worst] = np.asarray(values[:num_migrants], dtype=np.int8)
+        self.fitness[worst] = fitness[:num_migrants]
+        self.dirty[worst] = False
+        return num_migrants
+
+    def best(self, count):
+        # Indices of the `count` fittest individuals, best first
+        count = min(count, len(self))
+        if not count:
+            return np.zeros(0, dtype=np.intp)
+        top = np.argpartition(-self.fitness, count - 1)[:count]
+        return top[np.argsort(-self.fitness[top], kind='stable')]
+
+    def candidate(self, idx):
+        candidate = Candidate()
+        candidate.values = self.values[idx].astype(int)
+        candidate.fitness = float(self.fitness[idx])
+        return candidate
\ No newline at end of file
@@ -1,201 +1,313 @@
+from collections import deque
+from itertools import combinations
 import numpy as np
 
+# Candidates are 9-bit masks (bit d set <=> digit d is possible) and cells are numbered 0..80.
+# Units 0-8 are rows, 9-17 columns and 18-26 boxes. For every unit and digit, positions keeps
+# the mask of places inside that unit where the digit is still a candidate of an empty cell.
+ALL_CANDIDATES = 0b1111111110
+POPCOUNT = [bin(mask).count("1") for mask in range(1 << 10)]
+
+ROW_CELLS = [[row * 9 + col for col in range(9)] for row in range(9)]
+COL_CELLS = [[row * 9 + col for row in range(9)] for col in range(9)]
+BOX_CELLS = [[(box // 3 * 3 + r) * 9 + box % 3 * 3 + c for r in range(3) for c in range(3)] for box in range(9)]
+UNIT_CELLS = ROW_CELLS + COL_CELLS + BOX_CELLS
+CELL_UNITS = [(cell // 9, 9 + cell % 9, 18 + (cell // 9) // 3 * 3 + (cell % 9) // 3) for cell in range(81)]
+CELL_UNIT_POSITIONS = [(cell % 9, cell // 9, (cell // 9) % 3 * 3 + (cell % 9) % 3) for cell in range(81)]
+
+# Techniques in cost order. Unit techniques are rerun on the units touched since their last
+# run; board techniques are rerun whenever any candidate changed since their last run.
+TECHNIQUES = (
+    "naked_single", "hidden_single", "naked_pair", "pointing", "box_line",
+    "hidden_pair", "naked_triple", "hidden_triple", "x_wing", "swordfish"
+)
+UNIT_TECHNIQUE_SCOPES = {
+    "hidden_single": range(27),
+    "naked_pair": range(27),
+    "pointing": range(18, 27),
+    "box_line": range(18),
+    "hidden_pair": range(27),
+    "naked_triple": range(27),
+    "hidden_triple": range(27),
+}
+BOARD_TECHNIQUES = ("x_wing", "swordfish")
+
+def digits_of(mask):
+    return [digit for digit in range(1, 10) if mask >> digit & 1]
+
 class PreProcessing(object):
 
-    def __init__(self, sudoku):
+    def __init__(self, sudoku, techniques=TECHNIQUES):
 
         self.sudoku = sudoku
-        self.candidates_matrix = np.full((9, 9), None)
-        self.checked_naked_pairs = []
+        self.board = [int(value) for value in np.asarray(sudoku).ravel()]
+        self.candidates = [0] * 81
+        self.positions = [[0] * 10 for _ in range(27)]
+
+        self.techniques = tuple(techniques)
+        self.unit_techniques = [name for name in self.techniques if name in UNIT_TECHNIQUE_SCOPES]
+        self.board_techniques = [name for name in self.techniques if name in BOARD_TECHNIQUES]
+        self.technique_stats = {name: {'filled': 0, 'removed': 0} for name in self.techniques}
+        self.active_technique = None
+
+        # One work queue per technique. A unit is queued again whenever one of its empty
+        # cells loses a candidate or gets placed.
+        self.single_queue = deque()
+        self.unit_queues = {name: deque(UNIT_TECHNIQUE_SCOPES[name]) for name in self.unit_techniques}
+        self.unit_queued = {name: [unit in UNIT_TECHNIQUE_SCOPES[name] for unit in range(27)]
+                            for name in self.unit_techniques}
+        self.changed_since = {name: True for name in self.board_techniques}
+
         self.map_initial_candidates()
 
     def map_initial_candidates(self):
 
-        for row in range(9):
-            for col in range(9):
-                if self.sudoku[row, col] == 0:
-                    self.candidates_matrix[row, col] = self.get_candidates(row, col)
-                else:
-                    self.candidates_matrix[row, col] = set()
+        for cell in range(81):
+            if self.board[cell] == 0:
+                self.candidates[cell] = self.get_candidates(cell // 9, cell % 9)
+                for digit in digits_of(self.candidates[cell]):
+                    for unit, position in zip(CELL_UNITS[cell], CELL_UNIT_POSITIONS[cell]):
+                        self.positions[unit][digit] |= 1 << position
+                if POPCOUNT[self.candidates[cell]] == 1:
+                    self.single_queue.append(cell)
 
     def get_candidates(self, row, col):
 
-        all_numbers = set(range(1, 10))
-        used_numbers = set(self.sudoku[row, :]) | set(self.sudoku[:, col])
-        grid_row = (row // 3) * 3
-        grid_col = (col // 3) * 3
-        used_numbers |= set(self.sudoku[grid_row:grid_row+3, grid_col:grid_col+3].flatten())
-        candidates = all_numbers - used_numbers
-        return candidates
-
-    def analyze_cell(self, row, col):
-
-        sudoku_updated = False
-
-        candidates = self.candidates_matrix[row, col]
-
-        # Naked Single/Obvious Single
-        if len(candidates) == 1:
-            self.sudoku[row, col] = candidates.pop()
-            self.update_candidates(row, col)
-            sudoku_updated = True
-
-        if sudoku_updated:
-            return True
-
-        # Naked Pair/Obvius Pairs
-        for group_type, group_indice in [
-            ("row", [(row, i) for i in range(9)]),
-            ("col", [(i, col) for i in range(9)]),
-            ("subgrid", [(row // 3 * 3 + r, col // 3 * 3 + c) for r in range(3) for c in range(3)])
-        ]:
-            pairs = {}
-            for r, c in group_indice:
-                if self.sudoku[r, c] == 0 and len(self.candidates_matrix[r, c]) == 2:
-                    candidates_tuple = tuple(sorted(self.candidates_matrix[r, c]))
-                    if candidates_tuple in pairs:
-                        pairs[candidates_tuple].append((r, c))
-                    else:
-                        pairs[candidates_tuple] = [(r, c)]
-
-            for candidates_tuple, cells in pairs.items():
-                if len(cells) == 2:
-                    r1, c1 = cells[0]
-                    r2, c2 = cells[1]
-                    is_naked_pair = True
-                    if [(r1,c1), (r2,c2)] not in self.checked_naked_pairs:
-                        for r, c in group_indice:
-                            if (r, c) not in cells and len(self.candidates_matrix[r, c]) == 2:
-                                if all(candidate in self.candidates_matrix[r, c] for candidate in candidates_tuple):
-                                    is_naked_pair = False
-                                    break
-                        if is_naked_pair:
-                            self.checked_naked_pairs.append([(r1,c1), (r2,c2)])
-                            for r, c in group_indice:
-                                if (r, c) not in cells and self.candidates_matrix[r, c]:
-                                    self.candidates_matrix[r, c] -= set(candidates_tuple)
-                                    sudoku_updated = True
-
-        if sudoku_updated:
-            return True
-
-        # Hidden Single
-        for group_type in ["row", "col", "subgrid"]:
-
-            for index in range(9):
-                if group_type == "row":
-                    group_indice = [(index, i) for i in range(9)]
-                elif group_type == "col":
-                    group_indice = [(i, index) for i in range(9)]
-                elif group_type == "subgrid":
-                    row_start, col_start = (index // 3) * 3, (index % 3) * 3
-                    group_indice = [(row_start + r, col_start + c) for r in range(3) for c in range(3)]
-                
-                for candidate in range(1, 10):
-                    count = 0
-                    last_position = None
-                    for r, c in group_indice:
-                        if self.sudoku[r, c] == 0 and candidate in self.candidates_matrix[r, c]:
-                            count += 1
-                            last_position = (r, c)
-
-                    if count == 1 and last_position:
-                        self.sudoku[last_position[0], last_position[1]] = candidate
-                        self.update_candidates(last_position[0], last_position[1])
-                        sudoku_updated = True
-
-        if sudoku_updated:
+        used_numbers = 0
+        for unit in CELL_UNITS[row * 9 + col]:
+            for cell in UNIT_CELLS[unit]:
+                used_numbers |= 1 << self.board[cell]
+        return ALL_CANDIDATES & ~used_numbers
+
+    @property
+    def candidates_matrix(self):
+        # Digits still possible per cell as 9-bit masks; filled cells hold the bit of their value
+        masks = [candidates if value == 0 else 1 << value for value, candidates in zip(self.board, self.candidates)]
+        return np.array(masks, dtype=np.int16).reshape(9, 9)
+
+    def _touch(self, cell):
+        for name in self.board_techniques:
+            self.changed_since[name] = True
+        for unit in CELL_UNITS[cell]:
+            for name in self.unit_techniques:
+                queued = self.unit_queued[name]
+                if not queued[unit] and unit in UNIT_TECHNIQUE_SCOPES[name]:
+                    queued[unit] = True
+                    self.unit_queues[name].append(unit)
+
+    def _remove(self, cell, mask):
+        removed = self.candidates[cell] & mask
+        if removed and self.board[cell] == 0:
+            self.candidates[cell] &= ~removed
+            for digit in digits_of(removed):
+                for unit, position in zip(CELL_UNITS[cell], CELL_UNIT_POSITIONS[cell]):
+                    self.positions[unit][digit] &= ~(1 << position)
+            if POPCOUNT[self.candidates[cell]] == 1:
+                self.single_queue.append(cell)
+            self._touch(cell)
+            return removed
+        return 0
+
+    def eliminate(self, cell, mask):
+        removed = self._remove(cell, mask)
+        if removed and self.active_technique is not None:
+            self.technique_stats[self.active_technique]['removed'] += POPCOUNT[removed]
+        return removed
+
+    def place(self, cell, digit):
+        for candidate in digits_of(self.candidates[cell]):
+            for unit, position in zip(CELL_UNITS[cell], CELL_UNIT_POSITIONS[cell]):
+                self.positions[unit][candidate] &= ~(1 << position)
+        self.candidates[cell] = 0
+        self.board[cell] = digit
+        self.sudoku[cell // 9, cell % 9] = digit
+        if self.active_technique is not None:
+            self.technique_stats[self.active_technique]['filled'] += 1
+        self._touch(cell)
+        self.update_candidates(cell // 9, cell % 9)
+
+    # Naked Single/Obvious Single
+    def naked_single(self, cell):
+        candidates = self.candidates[cell]
+        if self.board[cell] == 0 and POPCOUNT[candidates] == 1:
+            self.place(cell, candidates.bit_length() - 1)
             return True
-        else:
-            return False
+        return False
+
+    # Hidden Single
+    def hidden_single(self, unit):
+        updated = False
+        for candidate in range(1, 10):
+            mask = self.positions[unit][candidate]
+            if mask and not mask & (mask - 1):
+                self.place(UNIT_CELLS[unit][mask.bit_length() - 1], candidate)
+                updated = True
+        return updated
+
+    # Naked Pair/Obvius Pairs
+    def naked_pair(self, unit):
+        return self.naked_subset(unit, 2)
+
+    def naked_triple(self, unit):
+        return self.naked_subset(unit, 3)
+
+    def naked_subset(self, unit, size):
+        # `size` cells whose candidates together hold only `size` digits own those digits
+        updated = False
+        cells = [cell for cell in UNIT_CELLS[unit]
+                 if self.board[cell] == 0 and 2 <= POPCOUNT[self.candidates[cell]] <= size]
+
+        for subset in combinations(cells, size):
+            union = 0
+            for cell in subset:
+                union |= self.candidates[cell]
+            if POPCOUNT[union] == size:
+                for cell in UNIT_CELLS[unit]:
+                    if cell not in subset and self.eliminate(cell, union):
+                        updated = True
+        return updated
+
+    # Hidden Pair/Triple
+    def hidden_pair(self, unit):
+        return self.hidden_subset(unit, 2)
+
+    def hidden_triple(self, unit):
+        return self.hidden_subset(unit, 3)
+
+    def hidden_subset(self, unit, size):
+        # `size` digits that fit only in the same `size` cells clear every other candidate there
+        updated = False
+        positions = self.positions[unit]
+        digits = [digit for digit in range(1, 10) if 2 <= POPCOUNT[positions[digit]] <= size]
+
+        for subset in combinations(digits, size):
+            union = 0
+            keep = 0
+            for digit in subset:
+                union |= positions[digit]
+                keep |= 1 << digit
+            if POPCOUNT[union] == size:
+                for index in range(9):
+                    if union >> index & 1 and self.eliminate(UNIT_CELLS[unit][index], ALL_CANDIDATES & ~keep):
+                        updated = True
+        return updated
+
+    # Pointing Pair/Triple
+    def pointing(self, unit):
+        # A digit confined to one row (or column) of a box leaves the rest of that line
+        updated = False
+        box = unit - 18
+        box_cells = BOX_CELLS[box]
+        for digit in range(1, 10):
+            mask = self.positions[unit][digit]
+            if not mask:
+                continue
+            for band in range(3):
+                if not mask & ~(0b111 << 3 * band):
+                    line = ROW_CELLS[box // 3 * 3 + band]
+                    updated |= self._eliminate_outside(line, box_cells, 1 << digit)
+                if not mask & ~(0b001001001 << band):
+                    line = COL_CELLS[box % 3 * 3 + band]
+                    updated |= self._eliminate_outside(line, box_cells, 1 << digit)
+        return updated
+
+    # Box/Line Reduction
+    def box_line(self, unit):
+        # A digit confined to one box within a row (or column) leaves the rest of that box
+        updated = False
+        line_cells = UNIT_CELLS[unit]
+        for digit in range(1, 10):
+            mask = self.positions[unit][digit]
+            if not mask:
+                continue
+            for segment in range(3):
+                if not mask & ~(0b111 << 3 * segment):
+                    box = CELL_UNITS[line_cells[3 * segment]][2] - 18
+                    updated |= self._eliminate_outside(BOX_CELLS[box], line_cells, 1 << digit)
+        return updated
+
+    def _eliminate_outside(self, cells, excluded_cells, mask):
+        updated = False
+        for cell in cells:
+            if cell not in excluded_cells and self.eliminate(cell, mask):
+                updated = True
+        return updated
 
     # X-Wings
     def x_wing(self):
-
-        updated_in_x_wing = False
-
-        for number in range(1, 10):
-            row_pairs = {}
-            for r in range(9):
-                cols_with_num = [c for c in range(9) if self.sudoku[r, c] == 0 and number in self.candidates_matrix[r, c]]
-                if len(cols_with_num) == 2:
-                    cols_tuple = tuple(cols_with_num)
-                    if cols_tuple not in row_pairs:
-                        row_pairs[cols_tuple] = []
-                    row_pairs[cols_tuple].append(r)
-
-            for cols, rows in row_pairs.items():
-                if len(rows) == 2:
-                    col1, col2 = cols
-                    row1, row2 = rows
-                    for r_idx in range(9):
-                        if r_idx not in rows:
-                            if self.sudoku[r_idx, col1] == 0 and number in self.candidates_matrix[r_idx, col1]:
-                                self.candidates_matrix[r_idx, col1].remove(number)
-                                updated_in_x_wing = True
-                            if self.sudoku[r_idx, col2] == 0 and number in self.candidates_matrix[r_idx, col2]:
-                                self.candidates_matrix[r_idx, col2].remove(number)
-                                updated_in_x_wing = True
-
-        for number in range(1, 10):
-            col_pairs = {}
-            for c in range(9):
-                rows_with_num = [r for r in range(9) if self.sudoku[r, c] == 0 and number in self.candidates_matrix[r, c]]
-                if len(rows_with_num) == 2:
-                    rows_tuple = tuple(rows_with_num)
-                    if rows_tuple not in col_pairs:
-                        col_pairs[rows_tuple] = []
-                    col_pairs[rows_tuple].append(c)
-        
-            for rows, cols in col_pairs.items():
-                if len(cols) == 2:
-                    row1, row2 = rows
-                    col1, col2 = cols
-                    for c_idx in range(9):
-                        if c_idx not in cols:
-                            if self.sudoku[row1, c_idx] == 0 and number in self.candidates_matrix[row1, c_idx]:
-                                self.candidates_matrix[row1, c_idx].remove(number)
-                                updated_in_x_wing = True
-                            if self.sudoku[row2, c_idx] == 0 and number in self.candidates_matrix[row2, c_idx]:
-                                self.candidates_matrix[row2, c_idx].remove(number)
-                                updated_in_x_wing = True
-
-        return updated_in_x_wing
+        return self.fish(2)
+
+    # Swordfish
+    def swordfish(self):
+        return self.fish(3)
+
+    def fish(self, size):
+        # `size` rows whose places for a digit span only `size` columns clear that digit from
+        # the rest of those columns, and the same with rows and columns exchanged
+        updated = False
+
+        for lines, crossing_units in ((range(0, 9), COL_CELLS), (range(9, 18), ROW_CELLS)):
+            for number in range(1, 10):
+                bit = 1 << number
+                base_lines = [line for line in lines if 2 <= POPCOUNT[self.positions[line][number]] <= size]
+
+                for subset in combinations(base_lines, size):
+                    union = 0
+                    for line in subset:
+                        union |= self.positions[line][number]
+                    if POPCOUNT[union] == size:
+                        base = [line % 9 for line in subset]
+                        for cross in range(9):
+                            if union >> cross & 1:
+                                for other_line in range(9):
+                                    if other_line not in base and self.eliminate(crossing_units[cross][other_line], bit):
+                                        updated = True
+
+        return updated
 
     def update_candidates(self, row, col):
 
-        placed_number = self.sudoku[row,col]
+        bit = 1 << self.board[row * 9 + col]
+
+        for unit in CELL_UNITS[row * 9 + col]:
+            for cell in UNIT_CELLS[unit]:
+                self._remove(cell, bit)
 
-        for c in range (9):
-            if placed_number in self.candidates_matrix[row, c]:
-                self.candidates_matrix[row, c].remove(placed_number)
+    def _run(self, name, *args):
+        self.active_technique = name
+        try:
+            return getattr(self, name)(*args)
+        finally:
+            self.active_technique = None
 
-        for r in range (9):
-            if placed_number in self.candidates_matrix[r, col]:
-                self.candidates_matrix[r, col].remove(placed_number)
+    def _next_step(self):
+        if self.single_queue and "naked_single" in self.technique_stats:
+            self._run("naked_single", self.single_queue.popleft())
+            return True
+
+        for name in self.unit_techniques:
+            if self.unit_queues[name]:
+                unit = self.unit_queues[name].popleft()
+                self.unit_queued[name][unit] = False
+                self._run(name, unit)
+                return True
+
+        for name in self.board_techniques:
+            if self.changed_since[name]:
+                self.changed_since[name] = False
+                if self._run(name):
+                    return True
 
-        grid_row = (row // 3) * 3
-        grid_col = (col // 3) * 3
+        return False
 
-        for r in range(grid_row, grid_row + 3):
-            for c in range(grid_col, grid_col + 3):
-                if placed_number in self.candidates_matrix[r, c]:
-                    self.candidates_matrix[r, c].remove(placed_number)
+    def propagate(self):
+        # Runs the techniques in cost order until none of them changes anything
+        while self._next_step():
+            pass
 
     def preprocess(self):
         initial_zeros = np.count_nonzero(self.sudoku == 0)
-        updated = True
-        while updated:
-            updated = False
-            for row in range(9):
-                for col in range(9):
-                    if self.sudoku[row, col] == 0:
-                        if self.analyze_cell(row, col):
-                            updated = True
-            
-            if self.x_wing():
-                updated = True
-
+        self.propagate()
         final_zeros = np.count_nonzero(self.sudoku == 0)
         numbers_filled_by_pp = initial_zeros - final_zeros
         return self.sudoku, numbers_filled_by_pp
@@ -212,4 +324,6 @@ class Controller(object):
     def controller(self):
         preprocessor = PreProcessing(self.sudoku)
         final_board, numbers_filled = preprocessor.preprocess()
-        return final_board, numbers_filled
\ No newline at end of file
+        self.technique_stats = preprocessor.technique_stats
+        self.candidates = preprocessor.candidates_matrix
+        return final_board, numbers_filled
@@ -1,26 +1,35 @@
 import numpy as np
-import random
-import operator
+import time
 
 from .config import *
-from .individual import Candidate, Fixed
+from .individual import Candidate, Fixed, GivenIndex
+from .fitness import UnitCounts, fitness_summary
 from .population import Population
-from .genetic_operators import Tournament, CXCrossover, mutate
-
-random.seed()
+from .validation import no_duplicates, is_solved
+from .exact import ExactSolver, repair
+from .islands import solve_islands, solve_portfolio
+from .genetic_operators import Tournament, CXCrossover, select_survivors, select_mutations, local_search
 
 class Sudoku(object):
 
-    def __init__(self):
+    def __init__(self, seed=None, population_size=None):
         self.given = None
+        self.index = None
+        self.seed = seed
+        self.population_size = population_size
+        self.rng = np.random.default_rng(seed)
         return
 
-    def load(self, p_values):
+    def load(self, p_values, candidates=None):
         self.given = Fixed(p_values)
+        self.index = GivenIndex(p_values, candidates)
         return
 
-    def solve(self, progress_callback=None):
-        population_size_used = POPULATION_SIZE
+    def solve(self, progress_callback=None, mode=None, migration=None):
+        # `migration(generation, population)` is called once per generation after scoring and
+        # may exchange individuals; returning False stops the run (used by the island model)
+        mode = SOLVER_MODE if mode is None else mode
+        population_size_used = POPULATION_SIZE if self.population_size is None else self.population_size
         quant_elite_used = int(ELITE_PERCENTAGE * population_size_used)
         if quant_elite_used % 2 != 0 and (population_size_used - quant_elite_used) > 0:
             quant_elite_used = max(0, quant_elite_used -1)
@@ -31,9 +40,18 @@ class Sudoku(object):
         phi_accumulator = 0
         total_mutations_attempted = 0
         fitness_history = []
+        evaluation_history = []
+        total_fitness_evaluations = 0
         boxplot_data_per_generation = [] 
+        fitness_distribution = []
 
         reseed_count = 0
+        best_fitness_seen = 0.0
+        stagnant_generations = 0
+        solution_source = None
+        repair_stats = {'attempts': 0, 'nodes': 0}
+        local_search_stats = {'improvements': 0, 'evaluations': 0, 'time': 0.0}
+        stopped = False
 
         default_return_metrics = {
             'final_mutation_rate': INITIAL_MUTATION_RATE,
@@ -42,35 +60,54 @@ class Sudoku(object):
             'reseed_count': reseed_count,
             'fitness_history': fitness_history,
             'boxplot_data': boxplot_data_per_generation,
+            'fitness_distribution': fitness_distribution,
+            'evaluation_history': evaluation_history,
+            'fitness_evaluations': total_fitness_evaluations,
             'generation': -1,
             'solution_candidate': None,
-            'solution_index': -1
+            'solution_index': -1,
+            'solution_source': solution_source,
+            'repair_attempts': repair_stats['attempts'],
+            'repair_nodes': repair_stats['nodes'],
+            'local_search': local_search_stats,
+            'stopped': stopped
         }
 
-        if self.given is None or self.given.values is None or self.given.no_duplicates() == False:
+        if self.given is None or self.given.values is None or not no_duplicates(self.given.values):
             return default_return_metrics
 
+        if mode == "exact":
+            return self.solve_exact(default_return_metrics, progress_callback)
+        if mode == "islands":
+            return solve_islands(self, default_return_metrics)
+        if mode == "portfolio":
+            return solve_portfolio(self, default_return_metrics)
+
         self.population = Population()
-        seed_success = self.population.seed(population_size_used, self.given)
+        seed_success = self.population.seed(population_size_used, self.index, self.rng)
         if seed_success != 1:
             default_return_metrics['boxplot_data'] = boxplot_data_per_generation
             return default_return_metrics
 
         for generation_num in range(0, num_generations_to_run):
-            self.population.update_fitness()
-            all_fitness_values = [c.fitness for c in self.population.candidates if c.fitness is not None]
-
-            if all_fitness_values: 
-                boxplot_data_per_generation.append({
-                    'Geracao': generation_num,
-                    'Todas_Aptidoes': list(all_fitness_values)
-                })
+            full_evaluations = self.population.update_fitness()
+            incremental_evaluations = 0
+            all_fitness_values = self.population.fitness
+
+            if len(all_fitness_values):
+                fitness_distribution.append(fitness_summary(
+                    all_fitness_values, generation_num, FITNESS_HISTOGRAM_BINS, FITNESS_RESERVOIR_SIZE, self.rng))
+                if STORE_ALL_FITNESS:
+                    boxplot_data_per_generation.append({
+                        'Geracao': generation_num,
+                        'Todas_Aptidoes': all_fitness_values.tolist()
+                    })
 
             solution_found_candidate = None
             solution_index = -1
             max_f, min_f, avg_f = 0.0, 0.0, 0.0
 
-            if all_fitness_values:
+            if len(all_fitness_values):
                 max_f = np.max(all_fitness_values)
                 min_f = np.min(all_fitness_values)
                 avg_f = np.mean(all_fitness_values)
@@ -82,17 +119,38 @@ class Sudoku(object):
                     'Media_Aptidao': avg_f
                 })
                 if abs(max_f - 1.0) < 1e-9:
-                    for idx, c_sol in enumerate(self.population.candidates):
-                        if c_sol.fitness is not None and abs(c_sol.fitness - 1.0) < 1e-9 :
-                            if not np.any(c_sol.values == 0) and Fixed(c_sol.values).no_duplicates():
-                                solution_found_candidate = c_sol
-                                solution_index = idx
-                                break
-
+                    perfect = np.flatnonzero(np.abs(all_fitness_values - 1.0) < 1e-9)
+                    solved = perfect[self.valid_solutions(self.population.values[perfect])]
+                    if len(solved):
+                        solution_found_candidate = self.population.candidate(solved[0])
+                        solution_index = int(solved[0])
+                        solution_source = "AG"
+
+            if mode == "hybrid" and not solution_found_candidate:
+                if max_f > best_fitness_seen + 1e-12:
+                    best_fitness_seen = max_f
+                    stagnant_generations = 0
+                else:
+                    stagnant_generations += 1
+
+                if stagnant_generations >= REPAIR_STAGNATION_GENERATIONS or generation_num == num_generations_to_run - 1:
+                    stagnant_generations = 0
+                    repaired = self.repair_best(repair_stats)
+                    if repaired is not None:
+                        solution_found_candidate, solution_index = repaired
+                        solution_source = "Reparo"
+
+
+            if migration is not None and not solution_found_candidate:
+                if migration(generation_num, self.population) is False:
+                    # The evaluations of this generation are counted before leaving the loop
+                    total_fitness_evaluations += full_evaluations
+                    stopped = True
+                    break
 
             if progress_callback:
                 self.population.sort()
-                best_candidate_current_gen = self.population.candidates[0] if self.population.candidates else None
+                best_candidate_current_gen = self.population.candidate(0) if len(self.population) else None
                 total_individuals_current = (generation_num + 1) * population_size_used
                 progress_callback(generation_num, best_candidate_current_gen, total_individuals_current, max_f)
 
@@ -106,104 +164,103 @@ class Sudoku(object):
                         'final_phi_success_rate': phi_success_rate,
                         'reseed_count': reseed_count,
                         'fitness_history': fitness_history,
-                        'boxplot_data': boxplot_data_per_generation 
+                        'boxplot_data': boxplot_data_per_generation,
+                        'fitness_distribution': fitness_distribution,
+                        'evaluation_history': evaluation_history,
+                        'fitness_evaluations': total_fitness_evaluations + full_evaluations,
+                        'solution_source': solution_source,
+                        'repair_attempts': repair_stats['attempts'],
+                        'repair_nodes': repair_stats['nodes'],
+                        'local_search': local_search_stats,
+                        'stopped': stopped
                         }
 
             self.population.sort()
 
-            tourney_selector = Tournament()
-            
-            pmx_crossover_op = CXCrossover()
-            offspring_population = []
-
-            parent_pool = self.population.candidates
-
-            while len(offspring_population) < population_size_used:
-                parent1 = tourney_selector.compete(parent_pool)
-                parent2 = tourney_selector.compete(parent_pool)
-
-                if parent1 is None or parent2 is None:
-                    continue
-
-                child1, child2 = pmx_crossover_op.crossover(parent1, parent2)
-
-                if child1 is not None and child1.values is not None:
-                    child1.update_fitness()
-                    old_fitness_c1 = child1.fitness if child1.fitness is not None else -1.0
-                    mutation_performed_c1 = mutate(child1, mutation_rate, self.given)
-                    if mutation_performed_c1:
-                        total_mutations_attempted += 1
-                        child1.update_fitness()
-                        if child1.fitness > old_fitness_c1: phi_accumulator += 1
-                    offspring_population.append(child1)
-
-                if len(offspring_population) >= population_size_used:
-                    break
-
-                if child2 is not None and child2.values is not None:
-                    child2.update_fitness()
-                    old_fitness_c2 = child2.fitness if child2.fitness is not None else -1.0
-                    mutation_performed_c2 = mutate(child2, mutation_rate, self.given)
-                    if mutation_performed_c2:
-                        total_mutations_attempted += 1
-                        child2.update_fitness()
-                        if child2.fitness > old_fitness_c2: phi_accumulator += 1
-                    offspring_population.append(child2)
-
-            combined_population = self.population.candidates + offspring_population
-            combined_population = sorted(
-                [c for c in combined_population if c.fitness is not None],
-                key=operator.attrgetter('fitness'),
-                reverse=True
-            )
-
-            next_population_candidates = []
-
-            num_elites = min(quant_elite_used, len(combined_population))
-            next_population_candidates.extend(combined_population[:num_elites])
-
-            tournament_pool = combined_population[num_elites:]
-            
-            num_to_select_from_tournament = population_size_used - len(next_population_candidates)
+            tourney_selector = Tournament(TOURNAMENT_SIZE, self.rng)
             
-            for _ in range(num_to_select_from_tournament):
-                if len(tournament_pool) < 2:
-                    if tournament_pool:
-                        next_population_candidates.append(tournament_pool.pop())
-                    break
-
-                participant1, participant2 = random.sample(tournament_pool, 2)
-                
-                winner = participant1 if participant1.fitness >= participant2.fitness else participant2
-                
-                next_population_candidates.append(winner)
-                tournament_pool.remove(winner)
-            
-            idx_filler = 0
-            while len(next_population_candidates) < population_size_used:
-                if not combined_population: break
-                filler_candidate = Candidate()
-                source_candidate = combined_population[idx_filler % len(combined_population)]
-                if source_candidate.values is not None:
-                    filler_candidate.values = np.copy(source_candidate.values)
-                    filler_candidate.update_fitness()
-                    next_population_candidates.append(filler_candidate)
-                idx_filler += 1
-                if idx_filler > 2 * population_size_used: break
-
-            if not next_population_candidates:
-                if self.population.seed(population_size_used, self.given) != 1:
+            cx_crossover_op = CXCrossover()
+            parent_values = self.population.values
+            parent_fitness = self.population.fitness
+
+            num_pairs = (population_size_used + 1) // 2
+            parents1, parents2 = tourney_selector.select(parent_fitness, 2 * num_pairs).reshape(2, -1)
+            children1, children2 = cx_crossover_op.crossover_batch(parent_values, parents1, parents2)
+
+            offspring_values = np.stack((children1, children2), axis=1).reshape(-1, 9, 9)[:population_size_used].astype(np.int8)
+            offspring_parents = np.stack((parents1, parents2), axis=1).reshape(-1)[:population_size_used]
+            num_offspring = len(offspring_values)
+            offspring_fitness = parent_fitness[offspring_parents]
+
+            # The random operator only checks legality against preprocessing candidates, as before
+            legal_only = self.index.candidates is not None or (MUTATION_LEGAL_ONLY and MUTATION_OPERATOR == "conflict")
+            mutation_rates = np.full(num_offspring, mutation_rate)
+            mutated, rows, from_columns, to_columns = select_mutations(
+                offspring_values, mutation_rates, self.index, self.rng, MUTATION_OPERATOR, legal_only)
+
+            # Children identical to the parent they were copied from keep its fitness unless they mutate
+            scored = np.any(offspring_values != parent_values[offspring_parents], axis=(1, 2))
+            scored[mutated] = True
+            scored = np.flatnonzero(scored)
+
+            offspring_counts = UnitCounts(offspring_values[scored])
+            offspring_fitness[scored] = offspring_counts.fitness()
+            full_evaluations += len(scored)
+
+            if len(mutated):
+                # All swaps go through the counts in one fancy-indexed call; the fitness before
+                # and after each swap feeds the PHI statistics
+                mutated_positions = np.searchsorted(scored, mutated)
+                mutated_fitness = offspring_counts.swap(mutated_positions, rows, from_columns, to_columns)
+                offspring_values[scored] = offspring_counts.values
+                incremental_evaluations += len(mutated_fitness)
+                total_mutations_attempted += len(mutated_fitness)
+                phi_accumulator += int(np.count_nonzero(mutated_fitness > offspring_fitness[mutated]))
+                offspring_fitness[mutated] = mutated_fitness
+
+            combined_values = np.concatenate((parent_values, offspring_values))
+            combined_fitness = np.concatenate((parent_fitness, offspring_fitness))
+            next_population_indices = select_survivors(combined_fitness, population_size_used, quant_elite_used, self.rng)
+
+            if not len(next_population_indices):
+                if self.population.seed(population_size_used, self.index, self.rng) != 1:
                     phi_success_rate = phi_accumulator / total_mutations_attempted if total_mutations_attempted > 0 else 0.0
                     default_return_metrics.update({
                         'generation': -2, 'final_mutation_rate': mutation_rate, 'final_sigma': sigma,
                         'final_phi_success_rate': phi_success_rate, 'reseed_count': reseed_count,
                         'fitness_history': fitness_history,
                         'boxplot_data': boxplot_data_per_generation,
-                        'solution_index': -1
+                        'fitness_evaluations': total_fitness_evaluations,
+                        'solution_index': -1,
+                        'repair_attempts': repair_stats['attempts'],
+                        'repair_nodes': repair_stats['nodes']
                         })
                     return default_return_metrics
             else:
-                 self.population.candidates = next_population_candidates
+                self.population.replace(combined_values[next_population_indices], combined_fitness[next_population_indices])
+
+            local_search_evaluations = 0
+            if LOCAL_SEARCH_ELITES > 0 and not np.any(self.population.dirty):
+                local_search_start = time.time()
+                num_elites = min(LOCAL_SEARCH_ELITES, len(self.population))
+                elites = np.argpartition(-self.population.fitness, num_elites - 1)[:num_elites]
+                elite_values = self.population.values[elites]
+                elite_fitness = self.population.fitness[elites]
+                improvements, local_search_evaluations = local_search(
+                    elite_values, elite_fitness, self.index, LOCAL_SEARCH_BUDGET, self.rng)
+                self.population.values[elites] = elite_values
+                self.population.fitness[elites] = elite_fitness
+                local_search_stats['improvements'] += improvements
+                local_search_stats['evaluations'] += local_search_evaluations
+                local_search_stats['time'] += time.time() - local_search_start
+
+            total_fitness_evaluations += full_evaluations + incremental_evaluations + local_search_evaluations
+            evaluation_history.append({
+                'Geracao': generation_num,
+                'Avaliacoes_Completas': full_evaluations,
+                'Avaliacoes_Incrementais': incremental_evaluations,
+                'Avaliacoes_Busca_Local': local_search_evaluations
+            })
 
             if 'max_f' in locals() and 'median_f' in locals() and max_f > 0:
                 
@@ -222,16 +279,9 @@ class Sudoku(object):
         phi_success_rate_final = phi_accumulator / total_mutations_attempted if total_mutations_attempted > 0 else 0.0
         best_candidate_at_end = None
 
-        if self.population.candidates:
+        if len(self.population):
             self.population.sort()
-            best_candidate_at_end = self.population.candidates[0]
-            if best_candidate_at_end and hasattr(best_candidate_at_end, 'values') and best_candidate_at_end.values is not None:
-                if not (abs(best_candidate_at_end.fitness - 1.0) < 1e-9 and \
-                        not np.any(best_candidate_at_end.values == 0) and \
-                        Fixed(best_candidate_at_end.values).no_duplicates()):
-                     pass
-            else:
-                best_candidate_at_end = None
+            best_candidate_at_end = self.population.candidate(0)
 
         default_return_metrics.update({
             'generation': -2,
@@ -242,6 +292,67 @@ class Sudoku(object):
             'final_phi_success_rate': phi_success_rate_final,
             'reseed_count': reseed_count,
             'fitness_history': fitness_history,
-            'boxplot_data': boxplot_data_per_generation 
+            'boxplot_data': boxplot_data_per_generation,
+            'fitness_evaluations': total_fitness_evaluations,
+            'repair_attempts': repair_stats['attempts'],
+            'repair_nodes': repair_stats['nodes'],
+            'stopped': stopped
+        })
+        return default_return_metrics
+
+    def valid_solutions(self, values):
+        # One flag per board of `values`: a board counts as solved only if it is a complete valid
+        # grid that still holds the givens
+        values = np.asarray(values).reshape(-1, 9, 9)
+        return is_solved(values) & self.index.keeps_givens(values)
+
+    def repair_best(self, repair_stats):
+        # Tries the bounded repair on the best distinct candidates, best first
+        fitness = self.population.fitness
+        top = np.argsort(-fitness, kind='stable')[:REPAIR_CANDIDATES * 4]
+        tried = set()
+        for idx in top:
+            key = self.population.values[idx].tobytes()
+            if key in tried:
+                continue
+            tried.add(key)
+
+            solution, nodes = repair(self.population.values[idx], self.index, REPAIR_NODE_LIMIT)
+            repair_stats['attempts'] += 1
+            repair_stats['nodes'] += nodes
+            if solution is not None and self.valid_solutions(solution)[0]:
+                candidate = Candidate()
+                candidate.values = solution.astype(np.int8)
+                candidate.update_fitness()
+                return candidate, int(idx)
+            if len(tried) >= REPAIR_CANDIDATES:
+                break
+        return None
+
+    def solve_exact(self, default_return_metrics, progress_callback=None):
+        start_time = time.time()
+        searcher = ExactSolver(self.index.fixed, self.index.legal_masks, EXACT_NODE_LIMIT)
+        solution = searcher.solve()
+        search_time = time.time() - start_time
+
+        solution_candidate = None
+        if solution is not None:
+            solution_candidate = Candidate()
+            solution_candidate.values = solution.astype(np.int8)
+            solution_candidate.update_fitness()
+
+        if progress_callback:
+            progress_callback(0, solution_candidate, 1, solution_candidate.fitness if solution_candidate else 0.0)
+
+        default_return_metrics.update({
+            'generation': 0 if solution is not None else -2,
+            'solution_candidate': solution_candidate,
+            'solution_index': 0 if solution is not None else -1,
+            'solution_source': "Exato" if solution is not None else None,
+            'final_mutation_rate': 0.0,
+            'final_phi_success_rate': 0.0,
+            'search_nodes': searcher.nodes,
+            'search_limit_reached': searcher.limit_reached,
+            'search_time': search_time
         })
-        return default_return_metrics
\ No newline at end of file
+        return default_return_metrics
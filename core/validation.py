@@ -0,0 +1,35 @@
+import numpy as np
+
+# Units are numbered as in the preprocessor: 0-8 rows, 9-17 columns and 18-26 blocks.
+# UNIT_CELLS[unit] lists the flat indices of the nine cells of that unit.
+_CELLS = np.arange(81).reshape(9, 9)
+UNIT_CELLS = np.concatenate([_CELLS, _CELLS.T, _CELLS.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(9, 9)])
+UNIT_NAMES = ("linha", "coluna", "bloco")
+
+def _as_stack(values):
+    values = np.asarray(values, dtype=np.intp)
+    return values.reshape(-1, 9, 9), values.ndim == 2
+
+def unit_duplicates(values):
+    # duplicated[n, unit]: some digit 1-9 appears more than once in that unit (zeros are ignored)
+    boards, single = _as_stack(values)
+    if not len(boards):
+        return np.zeros((0, 27), dtype=bool)
+
+    units = np.sort(boards.reshape(len(boards), 81)[:, UNIT_CELLS], axis=2)
+    duplicated = np.any((units[..., 1:] == units[..., :-1]) & (units[..., 1:] != 0), axis=2)
+    return duplicated[0] if single else duplicated
+
+def no_duplicates(values):
+    # One bool for a (9, 9) board, one per board for a (N, 9, 9) stack
+    valid = ~np.any(unit_duplicates(values), axis=-1)
+    return bool(valid) if valid.ndim == 0 else valid
+
+def is_solved(values):
+    boards, single = _as_stack(values)
+    solved = np.all(boards.reshape(len(boards), 81) != 0, axis=1) & no_duplicates(boards)
+    return bool(solved[0]) if single else solved
+
+def violated_units(values):
+    # [(unit name, index), ...] for a single board, e.g. [("linha", 0), ("bloco", 4)]
+    return [(UNIT_NAMES[unit // 9], unit % 9) for unit in np.flatnonzero(unit_duplicates(values)).tolist()]
@@ -111,6 +111,7 @@ class SudokuGUI(Frame):
         pp_controller = pp.Controller()
         pp_controller.load(np.copy(self.original_sudoku_problem)) 
         self.sudoku_pre_processed, _ = pp_controller.controller()
+        self.pp_candidates = pp_controller.candidates
         self.update_canvas_2()
 
 
@@ -188,10 +189,12 @@ class SudokuGUI(Frame):
 
         if use_preprocessing_result:
             board_to_solve = np.copy(self.sudoku_pre_processed)
+            candidates = self.pp_candidates
         else:
             board_to_solve = np.copy(self.original_sudoku_problem)
+            candidates = None
 
-        ga_sudoku.load(board_to_solve)
+        ga_sudoku.load(board_to_solve, candidates)
         start_time = time.time()
         
         solve_output = ga_sudoku.solve(progress_callback=lambda gen, best_cand, total_ind, best_fit: 
@@ -11,6 +11,10 @@ if __name__ == "__main__":
     default_puzzle_folder = os.path.join("puzzles", "mantere_collection")
     user_input_path = input(f"Digite o caminho para a pasta contendo os arquivos Sudoku .txt (padrão: {default_puzzle_folder}): ")
     puzzle_folder_path = user_input_path if user_input_path else default_puzzle_folder
+    user_input_workers = input("Digite o número de processos para executar os testes em paralelo (padrão: 1): ")
+    workers = int(user_input_workers) if user_input_workers.strip() else 1
+    user_input_checkpoint = input("Digite o caminho de um checkpoint (.jsonl) para retomar uma execução interrompida (padrão: nova execução): ")
+    checkpoint_path = user_input_checkpoint.strip() or None
 
     total_runs = 1
 
@@ -28,7 +32,9 @@ if __name__ == "__main__":
         output_file_name = f"evolutionary-sudoku-solver-{timestamp_for_filename}_run_{current_run}_sudoku_results.xlsx"
         full_output_path = os.path.join(results_folder, output_file_name)
 
-        batch_test_sudoku(puzzle_folder_path, output_file_name)
+        batch_test_sudoku(puzzle_folder_path, output_file_name, workers=workers,
+                          checkpoint_path=checkpoint_path if i == 0 else None,
+                          resume=checkpoint_path is not None and i == 0)
         
         if i < total_runs - 1:
             print(f"\n--- Execução {current_run} concluída. Aguardando 2 segundos antes da próxima. ---\n")
@@ -4,11 +4,15 @@ import time
 import re
 import pandas as pd
 import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from core.config import *
 from core import solver as ga
 from core import pre_processing as pp
+from core import validation
 from utils import fitness_reporter
+from utils import report_writers
+from utils.result_store import ResultStore
 
 
 def load_puzzle_from_file(file_path):
@@ -36,6 +40,12 @@ def load_puzzle_from_file(file_path):
         return None
 
 
+def format_technique_stats(technique_stats):
+    used = [f"{name}: {stats['filled']}/{stats['removed']}" for name, stats in technique_stats.items()
+            if stats['filled'] or stats['removed']]
+    return "; ".join(used) if used else "-"
+
+
 def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
     puzzle_data_for_run = np.copy(puzzle_data_orig)
     results = {
@@ -43,6 +53,7 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
         'time_ag_s': "0.000",
         'time_total_s': "0.000",
         'numbers_filled_by_pp': 0,
+        'pp_technique_stats': {},
         'ag_generations_taken': 'N/A',
         'ag_solution_position': 'N/A',
         'ag_final_mutation_rate': 'N/A',
@@ -50,12 +61,15 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
         'ag_final_phi_success_rate': 'N/A',
         'ag_reseed_count': 0,
         'ag_total_individuals_generated': 'N/A',
+        'ag_fitness_evaluations': 0,
+        'ag_solution_source': 'N/A',
         'final_status': 'Pendente',
         'final_board_state': np.copy(puzzle_data_for_run),
         'solved_by_pp_only': False,
         'error_message': '',
         'fitness_history': [],
-        'boxplot_data': []
+        'boxplot_data': [],
+        'fitness_distribution': []
     }
     ga_sudoku_instance = ga.Sudoku()
 
@@ -71,11 +85,11 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
             processed_puzzle, numbers_filled = pp_controller.controller()
             time_pp_val = time.time() - time_pp_start_local
             results['numbers_filled_by_pp'] = numbers_filled
+            results['pp_technique_stats'] = pp_controller.technique_stats
             results['final_board_state'] = np.copy(processed_puzzle)
 
             if not np.any(processed_puzzle == 0):
-                checker_board = ga.Fixed(processed_puzzle)
-                if checker_board.no_duplicates():
+                if validation.no_duplicates(processed_puzzle):
                     results['final_status'] = "Resolvido (Pré-proc.)"
                     results['solved_by_pp_only'] = True
                     results['ag_generations_taken'] = 0
@@ -86,7 +100,7 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
                     results['solved_by_pp_only'] = False
                     results['error_message'] = "Pré-processamento resultou em tabuleiro inválido."
             else:
-                ga_sudoku_instance.load(processed_puzzle)
+                ga_sudoku_instance.load(processed_puzzle, pp_controller.candidates)
                 time_ag_start_local = time.time()
                 solve_output = ga_sudoku_instance.solve()
                 time_ag_val = time.time() - time_ag_start_local
@@ -104,8 +118,11 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
                 results['ag_final_sigma'] = f"{solve_output['final_sigma']:.4f}" if isinstance(solve_output['final_sigma'], (int, float)) else 'N/A'
                 results['ag_final_phi_success_rate'] = f"{solve_output['final_phi_success_rate']:.4f}" if isinstance(solve_output['final_phi_success_rate'], (int, float)) else 'N/A'
                 results['ag_reseed_count'] = solve_output.get('reseed_count', 0)
+                results['ag_fitness_evaluations'] = solve_output.get('fitness_evaluations', 0)
+                results['ag_solution_source'] = solve_output.get('solution_source') or 'N/A'
                 results['fitness_history'] = solve_output.get('fitness_history', [])
                 results['boxplot_data'] = solve_output.get('boxplot_data', [])
+                results['fitness_distribution'] = solve_output.get('fitness_distribution', [])
 
                 effective_gen_cycles = 0
                 if gen_val is not None and isinstance(gen_val, int) and gen_val >= 0: effective_gen_cycles = gen_val + 1
@@ -118,8 +135,7 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
                 if solution_candidate and hasattr(solution_candidate, 'values') and gen_val not in [-1, -2]:
                     final_board_ag = solution_candidate.values
                     if not np.any(final_board_ag == 0):
-                        checker_board_ag = ga.Fixed(final_board_ag)
-                        if checker_board_ag.no_duplicates():
+                        if validation.no_duplicates(final_board_ag):
                             results['final_status'] = "Resolvido (AG)"
                             results['final_board_state'] = np.copy(final_board_ag)
                         else:
@@ -156,8 +172,11 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
             results['ag_final_sigma'] = f"{solve_output['final_sigma']:.4f}" if isinstance(solve_output['final_sigma'], (int, float)) else 'N/A'
             results['ag_final_phi_success_rate'] = f"{solve_output['final_phi_success_rate']:.4f}" if isinstance(solve_output['final_phi_success_rate'], (int, float)) else 'N/A'
             results['ag_reseed_count'] = solve_output.get('reseed_count', 0)
+            results['ag_fitness_evaluations'] = solve_output.get('fitness_evaluations', 0)
+            results['ag_solution_source'] = solve_output.get('solution_source') or 'N/A'
             results['fitness_history'] = solve_output.get('fitness_history', [])
             results['boxplot_data'] = solve_output.get('boxplot_data', [])
+            results['fitness_distribution'] = solve_output.get('fitness_distribution', [])
 
             effective_gen_cycles = 0
             if gen_val is not None and isinstance(gen_val, int) and gen_val >= 0: effective_gen_cycles = gen_val + 1
@@ -171,8 +190,7 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
             if solution_candidate and hasattr(solution_candidate, 'values') and gen_val not in [-1, -2]:
                 final_board_ag_no_pp = solution_candidate.values
                 if not np.any(final_board_ag_no_pp == 0):
-                    checker_board_ag_no_pp = ga.Fixed(final_board_ag_no_pp)
-                    if checker_board_ag_no_pp.no_duplicates():
+                    if validation.no_duplicates(final_board_ag_no_pp):
                         results['final_status'] = "Resolvido (AG)"
                         results['final_board_state'] = np.copy(final_board_ag_no_pp)
                     else:
@@ -202,7 +220,83 @@ def run_solver_for_puzzle(puzzle_data_orig, use_preprocessing=True):
 
     return results
 
-def batch_test_sudoku(folder_path, output_file_path="sudoku_test_results.xlsx"):
+def run_solver_job(job):
+    # Entry point for pool workers; timings are taken inside the worker by run_solver_for_puzzle
+    puzzle_data, use_preprocessing = job
+    return run_solver_for_puzzle(np.copy(puzzle_data), use_preprocessing=use_preprocessing)
+
+def job_result_row(txt_file, exec_type, initial_empty_cells, results, actual_elite_count):
+    # Prints the summary of one finished job and builds its row for the result store
+    ga_limite_estagnacao_valor = "N/A (Desativado)"
+    if exec_type == "Com_PP":
+        print(f"  {txt_file} - COM Pré-processamento...")
+        if results['solved_by_pp_only']:
+             print(f"    >> {txt_file} (Com PP): Resolvido APENAS pelo pré-processamento!")
+
+        print(f"    Números Preenchidos (PP): {results['numbers_filled_by_pp']}")
+        print(f"    Status: {results['final_status']}, Número da Geração: {results['ag_generations_taken']}, Quantidade de Gerações: {results['ag_generations_taken'] + 1 if isinstance(results['ag_generations_taken'], int) else results['ag_generations_taken']}, Indivíduos AG: {results['ag_total_individuals_generated']}")
+        print(f"    Tempos: PP: {results['time_pp_s']}s, AG: {results['time_ag_s']}s, Total: {results['time_total_s']}s")
+
+        row = {
+            "Arquivo": txt_file, "Celulas_Vazias_Iniciais": initial_empty_cells,
+            "GA_Tam_Populacao": POPULATION_SIZE, "GA_Max_Geracoes": MAX_GENERATIONS,
+            "GA_Perc_Elite": f"{ELITE_PERCENTAGE*100:.1f}% ({actual_elite_count})",
+            "GA_Taxa_Mutacao_Inicial": INITIAL_MUTATION_RATE,
+            "GA_Limite_Estagnacao_Reiniciar": ga_limite_estagnacao_valor,
+            "Tipo_Execucao": "Com_PP",
+            "Numeros_Preenchidos_PP": results['numbers_filled_by_pp'],
+            "PP_Tecnicas_Preenchidas_Removidas": format_technique_stats(results['pp_technique_stats']),
+            "Resolvido_Apenas_PP": results['solved_by_pp_only'],
+            "AG_Geracoes": results['ag_generations_taken'],
+            "AG_Taxa_Mutacao_Final": results['ag_final_mutation_rate'],
+            "AG_Sigma_Final": results['ag_final_sigma'],
+            "AG_PHI_Taxa_Sucesso_Final": results['ag_final_phi_success_rate'],
+            "AG_Total_Individuos_Gerados": results['ag_total_individuals_generated'],
+            "AG_Avaliacoes_Aptidao": results['ag_fitness_evaluations'],
+            "AG_Posicao_Solucao": results['ag_solution_position'],
+            "AG_Origem_Solucao": results['ag_solution_source'],
+            "Tempo_PP_s": results['time_pp_s'], "Tempo_AG_s": results['time_ag_s'],
+            "Tempo_Total_s": results['time_total_s'], "Status_Final": results['final_status'],
+            "Celulas_Vazias_Finais": np.count_nonzero(results['final_board_state'] == 0),
+            "Mensagem_Erro": results['error_message'],
+            "fitness_history": results['fitness_history'],
+            "boxplot_data": results['boxplot_data'],
+            "fitness_distribution": results['fitness_distribution']
+        }
+    else:
+        print(f"  {txt_file} - SEM Pré-processamento...")
+        print(f"    Status: {results['final_status']}, Número da Geração: {results['ag_generations_taken']}, Quantidade de Gerações: {results['ag_generations_taken'] + 1 if isinstance(results['ag_generations_taken'], int) else results['ag_generations_taken']}, Indivíduos AG: {results['ag_total_individuals_generated']}")
+        print(f"    Tempos: PP: {results['time_pp_s']}s, AG: {results['time_ag_s']}s, Total: {results['time_total_s']}s\n")
+
+        row = {
+            "Arquivo": txt_file, "Celulas_Vazias_Iniciais": initial_empty_cells,
+            "GA_Tam_Populacao": POPULATION_SIZE, "GA_Max_Geracoes": MAX_GENERATIONS,
+            "GA_Perc_Elite": f"{ELITE_PERCENTAGE*100:.1f}% ({actual_elite_count})",
+            "GA_Taxa_Mutacao_Inicial": INITIAL_MUTATION_RATE,
+            "GA_Limite_Estagnacao_Reiniciar": ga_limite_estagnacao_valor,
+            "Tipo_Execucao": "Sem_PP",
+            "Numeros_Preenchidos_PP": 0, "Resolvido_Apenas_PP": False,
+            "AG_Geracoes": results['ag_generations_taken'],
+            "AG_Taxa_Mutacao_Final": results['ag_final_mutation_rate'],
+            "AG_Sigma_Final": results['ag_final_sigma'],
+            "AG_PHI_Taxa_Sucesso_Final": results['ag_final_phi_success_rate'],
+            "AG_Reinicios_Populacao": results.get('ag_reseed_count', 0),
+            "AG_Total_Individuos_Gerados": results['ag_total_individuals_generated'],
+            "AG_Avaliacoes_Aptidao": results['ag_fitness_evaluations'],
+            "AG_Posicao_Solucao": results['ag_solution_position'],
+            "AG_Origem_Solucao": results['ag_solution_source'],
+            "Tempo_PP_s": results['time_pp_s'], "Tempo_AG_s": results['time_ag_s'],
+            "Tempo_Total_s": results['time_total_s'], "Status_Final": results['final_status'],
+            "Celulas_Vazias_Finais": np.count_nonzero(results['final_board_state'] == 0),
+            "Mensagem_Erro": results['error_message'],
+            "fitness_history": results['fitness_history'],
+            "boxplot_data": results['boxplot_data'],
+            "fitness_distribution": results['fitness_distribution']
+        }
+    return row
+
+def batch_test_sudoku(folder_path, output_file_path="sudoku_test_results.xlsx", workers=1, report_formats=REPORT_FORMATS,
+                      checkpoint_path=None, resume=False):
     if not os.path.isdir(folder_path):
         print(f"Erro: Pasta '{folder_path}' não encontrada.")
         return
@@ -215,14 +309,22 @@ def batch_test_sudoku(folder_path, output_file_path="sudoku_test_results.xlsx"):
     creation_timestamp = datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S")
     print(f"Encontrados {len(txt_files)} arquivos .txt em '{folder_path}'. Processando...\n")
 
-    all_run_data_for_output = []
+    # Every finished job is appended to the checkpoint file right away; with resume=True the jobs
+    # already recorded there are skipped and the reports are built from the whole file
+    if checkpoint_path is None:
+        checkpoint_path = output_file_path.replace(".xlsx", "") + "_checkpoint.jsonl"
+    result_store = ResultStore(checkpoint_path, resume=resume)
+    completed_jobs = result_store.completed_jobs()
+    if completed_jobs:
+        print(f"Retomando a partir de '{checkpoint_path}': {len(completed_jobs)} execuções já registradas serão puladas.\n")
+
     column_headers_main_report = [
         "Arquivo", "Celulas_Vazias_Iniciais",
         "GA_Tam_Populacao", "GA_Max_Geracoes", "GA_Perc_Elite", "GA_Taxa_Mutacao_Inicial", "GA_Limite_Estagnacao_Reiniciar",
-        "Tipo_Execucao", "Numeros_Preenchidos_PP", "Resolvido_Apenas_PP",
+        "Tipo_Execucao", "Numeros_Preenchidos_PP", "PP_Tecnicas_Preenchidas_Removidas", "Resolvido_Apenas_PP",
         "AG_Geracoes", "AG_Taxa_Mutacao_Final", "AG_Sigma_Final", "AG_PHI_Taxa_Sucesso_Final",
         "AG_Reinicios_Populacao",
-        "AG_Total_Individuos_Gerados", "AG_Posicao_Solucao",
+        "AG_Total_Individuos_Gerados", "AG_Avaliacoes_Aptidao", "AG_Posicao_Solucao", "AG_Origem_Solucao",
         "Tempo_PP_s", "Tempo_AG_s", "Tempo_Total_s", "Status_Final",
         "Celulas_Vazias_Finais", "Mensagem_Erro"
     ]
@@ -230,92 +332,56 @@ def batch_test_sudoku(folder_path, output_file_path="sudoku_test_results.xlsx"):
     if actual_elite_count % 2 != 0 and POPULATION_SIZE - actual_elite_count > 0:
         actual_elite_count = max(0, actual_elite_count -1)
 
-    for i, txt_file in enumerate(sorted(txt_files)):
-        file_path = os.path.join(folder_path, txt_file)
-        puzzle_data = load_puzzle_from_file(file_path)
-
-        ga_limite_estagnacao_valor = "N/A (Desativado)"
-
+    # Every puzzle is run with and then without preprocessing. With workers > 1 the jobs are
+    # spread over a process pool and each result is checkpointed as soon as its job finishes, in
+    # completion order; the final report sorts the rows back into file order.
+    puzzles = [(txt_file, load_puzzle_from_file(os.path.join(folder_path, txt_file))) for txt_file in sorted(txt_files)]
+    jobs = []
+    for txt_file, puzzle_data in puzzles:
         if puzzle_data is None:
             error_row = {header: 'N/A' for header in column_headers_main_report}
             error_row["Arquivo"] = txt_file
             error_row["Status_Final"] = "Erro ao Carregar"
-            error_row["GA_Limite_Estagnacao_Reiniciar"] = ga_limite_estagnacao_valor
+            error_row["GA_Limite_Estagnacao_Reiniciar"] = "N/A (Desativado)"
             error_row["AG_Reinicios_Populacao"] = 0
             error_row["boxplot_data"] = []
+            error_row["fitness_distribution"] = []
             error_row["fitness_history"] = []
-            all_run_data_for_output.append(error_row)
+            if (txt_file, 'N/A') not in completed_jobs:
+                result_store.append(error_row)
             print(f"Erro ao carregar {txt_file}. Pulando.")
             continue
+        for use_preprocessing, exec_type in ((True, "Com_PP"), (False, "Sem_PP")):
+            if (txt_file, exec_type) not in completed_jobs:
+                jobs.append((txt_file, exec_type, puzzle_data, use_preprocessing))
 
-        initial_empty_cells = np.count_nonzero(puzzle_data == 0)
-        print(f"--- Processando {txt_file} ({i+1}/{len(txt_files)}) ---")
-
-        print(f"  {txt_file} - COM Pré-processamento...")
-        results_pp = run_solver_for_puzzle(np.copy(puzzle_data), use_preprocessing=True)
-        if results_pp['solved_by_pp_only']:
-             print(f"    >> {txt_file} (Com PP): Resolvido APENAS pelo pré-processamento!")
-
-        print(f"    Números Preenchidos (PP): {results_pp['numbers_filled_by_pp']}")
-        print(f"    Status: {results_pp['final_status']}, Número da Geração: {results_pp['ag_generations_taken']}, Quantidade de Gerações: {results_pp['ag_generations_taken'] + 1 if isinstance(results_pp['ag_generations_taken'], int) else results_no_pp['ag_generations_taken']}, Indivíduos AG: {results_pp['ag_total_individuals_generated']}")
-        print(f"    Tempos: PP: {results_pp['time_pp_s']}s, AG: {results_pp['time_ag_s']}s, Total: {results_pp['time_total_s']}s")
-
-
-        row_pp_data = {
-            "Arquivo": txt_file, "Celulas_Vazias_Iniciais": initial_empty_cells,
-            "GA_Tam_Populacao": POPULATION_SIZE, "GA_Max_Geracoes": MAX_GENERATIONS,
-            "GA_Perc_Elite": f"{ELITE_PERCENTAGE*100:.1f}% ({actual_elite_count})",
-            "GA_Taxa_Mutacao_Inicial": INITIAL_MUTATION_RATE,
-            "GA_Limite_Estagnacao_Reiniciar": ga_limite_estagnacao_valor,
-            "Tipo_Execucao": "Com_PP",
-            "Numeros_Preenchidos_PP": results_pp['numbers_filled_by_pp'],
-            "Resolvido_Apenas_PP": results_pp['solved_by_pp_only'],
-            "AG_Geracoes": results_pp['ag_generations_taken'],
-            "AG_Taxa_Mutacao_Final": results_pp['ag_final_mutation_rate'],
-            "AG_Sigma_Final": results_pp['ag_final_sigma'],
-            "AG_PHI_Taxa_Sucesso_Final": results_pp['ag_final_phi_success_rate'],
-            "AG_Total_Individuos_Gerados": results_pp['ag_total_individuals_generated'],
-            "AG_Posicao_Solucao": results_pp['ag_solution_position'],
-            "Tempo_PP_s": results_pp['time_pp_s'], "Tempo_AG_s": results_pp['time_ag_s'],
-            "Tempo_Total_s": results_pp['time_total_s'], "Status_Final": results_pp['final_status'],
-            "Celulas_Vazias_Finais": np.count_nonzero(results_pp['final_board_state'] == 0),
-            "Mensagem_Erro": results_pp['error_message'],
-            "fitness_history": results_pp['fitness_history'],
-            "boxplot_data": results_pp['boxplot_data']
-        }
-        all_run_data_for_output.append(row_pp_data)
-
-        print(f"  {txt_file} - SEM Pré-processamento...")
-        results_no_pp = run_solver_for_puzzle(np.copy(puzzle_data), use_preprocessing=False)
-        print(f"    Status: {results_no_pp['final_status']}, Número da Geração: {results_no_pp['ag_generations_taken']}, Quantidade de Gerações: {results_no_pp['ag_generations_taken'] + 1 if isinstance(results_no_pp['ag_generations_taken'], int) else results_no_pp['ag_generations_taken']}, Indivíduos AG: {results_no_pp['ag_total_individuals_generated']}")
-        print(f"    Tempos: PP: {results_no_pp['time_pp_s']}s, AG: {results_no_pp['time_ag_s']}s, Total: {results_no_pp['time_total_s']}s\n")
+    # The pool is shut down even if the loop fails or is interrupted; jobs not started yet are
+    # cancelled instead of being run before the error surfaces
+    executor = None
+    try:
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = {executor.submit(run_solver_job, job[2:]): job for job in jobs}
+            # Each future is dropped from the dict as it completes, so its results are freed once
+            # the row has been written
+            finished_jobs = ((futures.pop(future), future.result()) for future in as_completed(futures))
+        else:
+            finished_jobs = ((job, run_solver_job(job[2:])) for job in jobs)
 
-        row_no_pp_data = {
-            "Arquivo": txt_file, "Celulas_Vazias_Iniciais": initial_empty_cells,
-            "GA_Tam_Populacao": POPULATION_SIZE, "GA_Max_Geracoes": MAX_GENERATIONS,
-            "GA_Perc_Elite": f"{ELITE_PERCENTAGE*100:.1f}% ({actual_elite_count})",
-            "GA_Taxa_Mutacao_Inicial": INITIAL_MUTATION_RATE,
-            "GA_Limite_Estagnacao_Reiniciar": ga_limite_estagnacao_valor,
-            "Tipo_Execucao": "Sem_PP",
-            "Numeros_Preenchidos_PP": 0, "Resolvido_Apenas_PP": False,
-            "AG_Geracoes": results_no_pp['ag_generations_taken'],
-            "AG_Taxa_Mutacao_Final": results_no_pp['ag_final_mutation_rate'],
-            "AG_Sigma_Final": results_no_pp['ag_final_sigma'],
-            "AG_PHI_Taxa_Sucesso_Final": results_no_pp['ag_final_phi_success_rate'],
-            "AG_Reinicios_Populacao": results_no_pp.get('ag_reseed_count', 0),
-            "AG_Total_Individuos_Gerados": results_no_pp['ag_total_individuals_generated'],
-            "AG_Posicao_Solucao": results_no_pp['ag_solution_position'],
-            "Tempo_PP_s": results_no_pp['time_pp_s'], "Tempo_AG_s": results_no_pp['time_ag_s'],
-            "Tempo_Total_s": results_no_pp['time_total_s'], "Status_Final": results_no_pp['final_status'],
-            "Celulas_Vazias_Finais": np.count_nonzero(results_no_pp['final_board_state'] == 0),
-            "Mensagem_Erro": results_no_pp['error_message'],
-            "fitness_history": results_no_pp['fitness_history'],
-            "boxplot_data": results_no_pp['boxplot_data']
-        }
-        all_run_data_for_output.append(row_no_pp_data)
+        for i, ((txt_file, exec_type, puzzle_data, _), results) in enumerate(finished_jobs):
+            print(f"--- {txt_file} ({i+1}/{len(jobs)}) ---")
+            initial_empty_cells = np.count_nonzero(puzzle_data == 0)
+            result_store.append(job_result_row(txt_file, exec_type, initial_empty_cells, results, actual_elite_count))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     try:
-        df = pd.DataFrame(all_run_data_for_output)
+        file_order = {txt_file: position for position, txt_file in enumerate(sorted(txt_files))}
+        exec_order = {"Com_PP": 0, "Sem_PP": 1}
+        main_rows = sorted(result_store.main_rows(column_headers_main_report),
+                           key=lambda row: (file_order.get(row["Arquivo"], len(file_order)), exec_order.get(row["Tipo_Execucao"], 2)))
+        df = pd.DataFrame(main_rows)
         for col in column_headers_main_report:
             if col not in df.columns:
                 df[col] = 'N/A'
@@ -328,11 +394,20 @@ def batch_test_sudoku(folder_path, output_file_path="sudoku_test_results.xlsx"):
 
         print(f"\nResultados dos testes salvos em: {output_file_path}")
 
-        output_folder_summary_fitness = output_file_path.replace(".xlsx", "_fitness_summary_reports")
-        fitness_reporter.generate_fitness_reports(all_run_data_for_output, output_folder_summary_fitness)
+        columnar_formats = [report_format for report_format in report_formats if report_format != "xlsx"]
+        if columnar_formats:
+            report_writers.write_telemetry(result_store, output_file_path.replace(".xlsx", ""), columnar_formats)
+
+        if "xlsx" in report_formats:
+            output_folder_summary_fitness = output_file_path.replace(".xlsx", "_fitness_summary_reports")
+            fitness_reporter.generate_fitness_reports(result_store, output_folder_summary_fitness)
+
+            output_folder_distribution = output_file_path.replace(".xlsx", "_fitness_distribution_reports")
+            fitness_reporter.generate_fitness_distribution_reports(result_store, output_folder_distribution)
 
-        output_folder_boxplot_data = output_file_path.replace(".xlsx", "_boxplot_data_reports")
-        fitness_reporter.generate_boxplot_data_reports(all_run_data_for_output, output_folder_boxplot_data)
+            if STORE_ALL_FITNESS:
+                output_folder_boxplot_data = output_file_path.replace(".xlsx", "_boxplot_data_reports")
+                fitness_reporter.generate_boxplot_data_reports(result_store, output_folder_boxplot_data)
 
     except ImportError:
         print("\nERRO: A biblioteca pandas e/ou openpyxl não estão instaladas.")
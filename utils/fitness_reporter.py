@@ -111,4 +111,51 @@ def generate_boxplot_data_reports(all_run_data, output_folder_path):
     if reports_generated_count > 0:
         print(f"{reports_generated_count} relatórios de dados para boxplot individuais foram salvos com sucesso.")
     else:
-        print("Nenhum dado de aptidão do AG foi encontrado para gerar relatórios para boxplot.")
\ No newline at end of file
+        print("Nenhum dado de aptidão do AG foi encontrado para gerar relatórios para boxplot.")
+
+def generate_fitness_distribution_reports(all_run_data, output_folder_path):
+    if not all_run_data:
+        print("Nenhum dado de execução encontrado para gerar relatórios de distribuição da aptidão.")
+        return
+
+    try:
+        os.makedirs(output_folder_path, exist_ok=True)
+        print(f"\nGerando relatórios de distribuição da aptidão na pasta: {output_folder_path}")
+    except Exception as e:
+        print(f"ERRO: Não foi possível criar o diretório de saída '{output_folder_path}' para relatórios de distribuição: {e}")
+        return
+
+    summary_columns = ['Geracao', 'Minimo', 'Quartil_1', 'Mediana', 'Quartil_3', 'Maximo', 'Media', 'Desvio_Padrao']
+    reports_generated_count = 0
+    for run_data in all_run_data:
+        file_name = run_data.get("Arquivo", "N/A")
+        exec_type = run_data.get("Tipo_Execucao", "N/A")
+        distribution = run_data.get("fitness_distribution", [])
+
+        if not distribution:
+            continue
+
+        try:
+            distribution_df = pd.DataFrame([{col: summary[col] for col in summary_columns} for summary in distribution])
+            histograms = pd.DataFrame([summary['Histograma'] for summary in distribution])
+            histograms.columns = [f"Histograma_{bin_idx}" for bin_idx in range(histograms.shape[1])]
+            distribution_df = pd.concat([distribution_df, histograms], axis=1)
+
+            base_name = os.path.splitext(file_name)[0]
+            report_filename = f"{base_name}_{exec_type}_fitness_distribution.xlsx"
+            full_output_path = os.path.join(output_folder_path, report_filename)
+
+            distribution_df.to_excel(full_output_path, index=False, sheet_name="Distribuicao_Aptidao")
+            reports_generated_count += 1
+
+        except ImportError:
+            print("\nERRO: Para gerar o relatório de distribuição da aptidão, as bibliotecas pandas e openpyxl são necessárias.")
+            print("Por favor, instale-as com: pip install pandas openpyxl")
+            return
+        except Exception as e:
+            print(f"\nOcorreu um erro inesperado ao tentar salvar o relatório de distribuição para '{file_name}' ({exec_type}): {e}")
+
+    if reports_generated_count > 0:
+        print(f"{reports_generated_count} relatórios de distribuição da aptidão individuais foram salvos com sucesso.")
+    else:
+        print("Nenhuma distribuição de aptidão do AG foi encontrada para gerar relatórios.")
@@ -0,0 +1,157 @@
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+# Telemetry tables are dicts of equally long numpy columns, built one run at a time. Each writer
+# appends them to one file per table as typed columns, never formatted row by row, so memory does
+# not grow with the corpus. The per-run xlsx reports stay in fitness_reporter.
+
+class CsvReportWriter(object):
+    extension = "csv"
+
+    def __init__(self, path):
+        self.output_file = open(path, "w", newline="", encoding="utf-8")
+        self.write_header = True
+        return
+
+    def append(self, table):
+        pd.DataFrame(table).to_csv(self.output_file, header=self.write_header, index=False)
+        self.write_header = False
+        return
+
+    def close(self):
+        self.output_file.close()
+        return
+
+class ParquetReportWriter(object):
+    extension = "parquet"
+
+    def __init__(self, path):
+        # Needs pyarrow; each appended run becomes one row group
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        self.parquet = pyarrow.parquet
+        self.path = path
+        self.writer = None
+        return
+
+    def append(self, table):
+        arrow_table = self.pyarrow.Table.from_pydict(table)
+        if self.writer is None:
+            self.writer = self.parquet.ParquetWriter(self.path, arrow_table.schema)
+        self.writer.write_table(arrow_table)
+        return
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        return
+
+class NpzReportWriter(object):
+    extension = "npz"
+
+    def __init__(self, path):
+        # Each run's columns are stored as their own arrays, named <run>_<column>
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self.num_runs = 0
+        return
+
+    def append(self, table):
+        for column, values in table.items():
+            with self.archive.open(f"{self.num_runs:05d}_{column}.npy", "w", force_zip64=True) as array_file:
+                np.lib.format.write_array(array_file, np.asarray(values), allow_pickle=False)
+        self.num_runs += 1
+        return
+
+    def close(self):
+        self.archive.close()
+        return
+
+REPORT_WRITERS = {
+    "csv": CsvReportWriter,
+    "parquet": ParquetReportWriter,
+    "npz": NpzReportWriter,
+}
+
+def get_report_writer(report_format, path):
+    if report_format not in REPORT_WRITERS:
+        raise ValueError(f"Formato de relatório desconhecido: {report_format}")
+    return REPORT_WRITERS[report_format](path)
+
+def _run_labels(run_data, length):
+    return {
+        'Arquivo': np.full(length, run_data.get("Arquivo", "N/A")),
+        'Tipo_Execucao': np.full(length, run_data.get("Tipo_Execucao", "N/A")),
+    }
+
+def fitness_history_table(run_data):
+    history = run_data.get("fitness_history", [])
+    if not history:
+        return None
+    table = _run_labels(run_data, len(history))
+    table['Geracao'] = np.array([entry['Geracao'] for entry in history], dtype=np.int32)
+    for column in ('Maior_Aptidao', 'Menor_Aptidao', 'Media_Aptidao'):
+        table[column] = np.array([entry[column] for entry in history], dtype=np.float64)
+    return table
+
+def fitness_distribution_table(run_data):
+    distribution = run_data.get("fitness_distribution", [])
+    if not distribution:
+        return None
+    table = _run_labels(run_data, len(distribution))
+    table['Geracao'] = np.array([summary['Geracao'] for summary in distribution], dtype=np.int32)
+    for column in ('Minimo', 'Quartil_1', 'Mediana', 'Quartil_3', 'Maximo', 'Media', 'Desvio_Padrao'):
+        table[column] = np.array([summary[column] for summary in distribution], dtype=np.float64)
+    histograms = np.stack([np.asarray(summary['Histograma'], dtype=np.int32) for summary in distribution])
+    for bin_idx in range(histograms.shape[1]):
+        table[f"Histograma_{bin_idx}"] = histograms[:, bin_idx]
+    return table
+
+def boxplot_data_table(run_data):
+    boxplot_data = run_data.get("boxplot_data", [])
+    if not boxplot_data:
+        return None
+    scores = [np.asarray(generation_data['Todas_Aptidoes'], dtype=np.float64) for generation_data in boxplot_data]
+    generations = [generation_data['Geracao'] for generation_data in boxplot_data]
+    table = _run_labels(run_data, sum(len(generation_scores) for generation_scores in scores))
+    table['Geracao'] = np.repeat(np.array(generations, dtype=np.int32), [len(generation_scores) for generation_scores in scores])
+    table['Aptidao_Individuo'] = np.concatenate(scores)
+    return table
+
+TELEMETRY_TABLES = {
+    "fitness_history": fitness_history_table,
+    "fitness_distribution": fitness_distribution_table,
+    "boxplot_data": boxplot_data_table,
+}
+
+def write_telemetry(all_run_data, output_base_path, report_formats):
+    # One file per table and format for the whole batch, e.g. <base>_fitness_history.csv. The
+    # runs are read once, in order, and each run's rows are appended as soon as they are built.
+    writers = {}
+    unavailable = set()
+    for run_data in all_run_data:
+        for table_name, build_table in TELEMETRY_TABLES.items():
+            table = build_table(run_data)
+            if table is None:
+                continue
+            for report_format in report_formats:
+                if report_format in unavailable:
+                    continue
+                key = (table_name, report_format)
+                if key not in writers:
+                    path = f"{output_base_path}_{table_name}.{REPORT_WRITERS[report_format].extension}"
+                    try:
+                        writers[key] = get_report_writer(report_format, path)
+                    except ImportError as e:
+                        print(f"\nERRO: O formato '{report_format}' precisa de uma biblioteca que não está instalada: {e}")
+                        unavailable.add(report_format)
+                        continue
+                writers[key].append(table)
+
+    for writer in writers.values():
+        writer.close()
+    if writers:
+        print(f"\n{len(writers)} arquivos de telemetria salvos em: {os.path.dirname(os.path.abspath(output_base_path))}")
+    return writers
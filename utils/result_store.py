@@ -0,0 +1,53 @@
+import json
+import os
+import numpy as np
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Valor não serializável: {type(value)}")
+
+class ResultStore(object):
+    # Append-only JSON Lines file with one result row per (puzzle, execution type) job. Each row
+    # is flushed to disk as soon as its job finishes, so an interrupted batch loses at most the
+    # job in progress. Iterating re-reads the file, one row at a time.
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        elif os.path.exists(path) and os.path.getsize(path):
+            # Ends a row cut short by a crash so the next append starts on its own line
+            with open(path, "rb+") as store_file:
+                store_file.seek(-1, os.SEEK_END)
+                if store_file.read(1) != b"\n":
+                    store_file.write(b"\n")
+        return
+
+    def __iter__(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as store_file:
+            for line in store_file:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A row cut short by a crash is ignored; its job runs again on resume
+                        continue
+
+    def append(self, row):
+        with open(self.path, "a", encoding="utf-8") as store_file:
+            store_file.write(json.dumps(row, default=_to_json) + "\n")
+            store_file.flush()
+            os.fsync(store_file.fileno())
+        return
+
+    def completed_jobs(self):
+        return {(row.get("Arquivo"), row.get("Tipo_Execucao")) for row in self}
+
+    def main_rows(self, columns):
+        return [{column: row.get(column, 'N/A') for column in columns} for row in self]